@@ -1,7 +1,26 @@
 import streamlit as st
 from datetime import datetime
-from database import init_database, add_task, get_all_tasks, update_task, delete_task
-from task_parser import parse_task, parse_transcript
+import io
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from database import (
+    check_database, count_tasks_by_priority, get_assignees, get_assignee_dashboard, update_task, delete_task,
+    task_cache, start_change_feed, PRIORITIES, DASHBOARD_DAYS
+)
+from live_board import BoardWatchers, current_session_id
+from task_cache import filter_tasks, page_tasks
+from board_view import column_html, task_label
+import tracing
+from tracing import span
+from task_parser import get_parse_cache, get_packing_stats
+from job_queue import JobQueue
+from llm_scheduler import get_scheduler_stats
+from fast_parser import get_fast_path_stats
+from bulk_io import EXPORT_DOWNLOAD_MAX_ROWS, FORMATS, detect_format, export_tasks, import_tasks
+
+# Collect timing spans for this rerun when tracing is enabled
+trace = tracing.start_rerun()
 
 # Page config
 st.set_page_config(
@@ -54,10 +73,98 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize database
-if 'db_initialized' not in st.session_state:
-    init_database()
-    st.session_state.db_initialized = True
+@st.cache_data(ttl=300)
+def known_assignees():
+    """Assignee names used by the local fast-path parser, refreshed every few minutes."""
+    return get_assignees()
+
+@st.cache_resource
+def job_queue():
+    """Background parse-and-save queue shared by every session in the process."""
+    return JobQueue()
+
+@st.cache_resource
+def board_watchers():
+    """Process-wide board watchers fed by the task cache, with the change feed started once."""
+    watchers = BoardWatchers()
+    task_cache.subscribe(watchers.on_change)
+    start_change_feed()
+    return watchers
+
+# Seconds a cached dashboard is reused when no task changes; overdue counts move with the clock
+DASHBOARD_TTL_SECONDS = 60
+
+@st.cache_data(ttl=DASHBOARD_TTL_SECONDS, show_spinner=False)
+def assignee_dashboard():
+    """Dashboard rows shared by every session and rerun until a task changes or the TTL passes."""
+    return get_assignee_dashboard()
+
+@st.cache_resource
+def dashboard_invalidation():
+    """Drop the cached dashboard on every write or pushed change the task cache sees."""
+    task_cache.subscribe(lambda **change: assignee_dashboard.clear())
+    return True
+
+@st.cache_resource
+def database_check():
+    """Probe the database once per process on a background thread, so a cold start paints without waiting for it."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='database-check').submit(check_database)
+
+# Seconds between progress polls while this session has jobs in flight
+JOB_POLL_SECONDS = 1.0
+
+def submit_job(kind, text, payload):
+    """Queue a job in the background and track it for this session."""
+    job_id = job_queue().submit(kind, text, payload)
+    jobs = st.session_state.setdefault('jobs', [])
+    if job_id not in jobs:
+        jobs.append(job_id)
+
+def show_jobs():
+    """Show progress of this session's jobs and the outcome of finished ones.
+
+    Returns True while any job is still queued or running.
+    """
+    active = False
+    for job_id in list(st.session_state.get('jobs', [])):
+        job = job_queue().get(job_id)
+        if job is None:
+            st.session_state.jobs.remove(job_id)
+            continue
+        label = "Tasks" if job['kind'] == 'tasks' else "Transcript"
+        if job['status'] in ('queued', 'running'):
+            active = True
+            retry = f" (attempt {job['attempts'] + 1}: {job['error']})" if job['error'] else ""
+            if job['total']:
+                st.progress(job['done'] / job['total'], text=f"{label}: {job['done']}/{job['total']} lines parsed{retry}")
+            else:
+                st.info(f"{label}: {job['status']}, {job['done']} tasks found so far{retry}")
+            continue
+        st.session_state.jobs.remove(job_id)
+        if job['status'] == 'failed':
+            st.error(f"Error adding tasks: {job['error']}")
+            continue
+        result = job['result']
+        for task_name in result['inserted']:
+            st.success(f"Added task: {task_name}")
+        for task_name in result['duplicates']:
+            st.warning(f"Task already exists: {task_name}")
+        for error in result['errors']:
+            st.warning(f"Could not parse task: {error}")
+        if not (result['inserted'] or result['duplicates']):
+            st.warning("Could not parse any tasks")
+    return active
+
+# Cards fetched per priority column on each page of the board
+BOARD_PAGE_SIZE = 100
+
+def board_page(tasks, priority):
+    """Return the current page of one priority column from its cursor stack."""
+    cursors = st.session_state.setdefault(f"board_cursors_{priority}", [None])
+    return page_tasks(tasks, after=cursors[-1], limit=BOARD_PAGE_SIZE)
+
+# Initialize database in the background; a failure is reported once the probe finishes
+database_probe = database_check()
 
 # Title
 st.title("✅ Natural Language Task Manager")
@@ -66,7 +173,7 @@ st.title("✅ Natural Language Task Manager")
 st.markdown("### Add Tasks")
 
 # Create tabs for different input methods
-tab1, tab2 = st.tabs(["Single Tasks", "Transcript"])
+tab1, tab2, tab3 = st.tabs(["Single Tasks", "Transcript", "Import / Export"])
 
 with tab1:
     col1, col2 = st.columns([3, 1])
@@ -81,27 +188,25 @@ with tab1:
         st.markdown("<br>", unsafe_allow_html=True)
         add_task_button = st.button("Add Tasks", type="primary", use_container_width=True)
 
-    # Process new tasks
+    # Queue new tasks; lines are parsed and saved in the background
     if add_task_button and task_input:
         tasks_to_add = [task.strip() for task in task_input.split('\n') if task.strip()]
-        
-        with st.spinner('Processing tasks...'):
-            for task_text in tasks_to_add:
-                parsed_task = parse_task(task_text)
-                if parsed_task:
-                    try:
-                        result = add_task(
-                            parsed_task['task_name'],
-                            parsed_task['assignee'],
-                            parsed_task['due_date'],
-                            parsed_task['priority']
-                        )
-                        if result:
-                            st.success(f"Added task: {parsed_task['task_name']}")
-                    except Exception as e:
-                        st.error(f"Error adding task: {str(e)}")
-                else:
-                    st.warning(f"Could not parse task: {task_text}")
+        submit_job('tasks', task_input, {'lines': tasks_to_add, 'known_assignees': known_assignees()})
+
+        stats = get_fast_path_stats()
+        cache_stats = get_parse_cache().stats()
+        st.caption(
+            f"Parsed locally: {stats['hits']} · Sent to OpenAI: {stats['misses']} · Local hit rate: {stats['hit_rate']:.0%} · "
+            f"Parse cache hit ratio: {cache_stats['hit_ratio']:.0%} ({cache_stats['entries']} entries)"
+        )
+        packing = get_packing_stats()
+        if packing['requests']:
+            st.caption(
+                f"Packed requests: {packing['requests']} for {packing['tasks']} lines · "
+                f"Prompt tokens per task: {packing['prompt_tokens_per_task']:.0f} "
+                f"(vs {packing['unpacked_prompt_tokens_per_task']:.0f} one line per request) · "
+                f"LLM time per task: {packing['seconds_per_task'] * 1000:.0f} ms · Retried alone: {packing['retries']}"
+            )
 
 with tab2:
     col1, col2 = st.columns([3, 1])
@@ -116,95 +221,224 @@ with tab2:
         st.markdown("<br>", unsafe_allow_html=True)
         add_transcript_button = st.button("Process Transcript", type="primary", use_container_width=True)
 
-    # Process transcript
+    # Queue the transcript; chunks are parsed and saved in the background
     if add_transcript_button and transcript_input:
-        with st.spinner('Processing transcript...'):
-            parsed_tasks = parse_transcript(transcript_input)
-            if parsed_tasks:
-                for task in parsed_tasks:
-                    try:
-                        result = add_task(
-                            task['task_name'],
-                            task['assignee'],
-                            task['due_date'],
-                            task['priority']
-                        )
-                        if result:
-                            st.success(f"Added task: {task['task_name']}")
-                    except Exception as e:
-                        st.error(f"Error adding task: {str(e)}")
+        submit_job('transcript', transcript_input, {'text': transcript_input})
+
+with tab3:
+    # Structured files skip the LLM entirely and are streamed in batches
+    import_col, export_col = st.columns(2)
+    with import_col:
+        uploaded = st.file_uploader("Import tasks from CSV or JSONL", type=[ext.lstrip('.') for ext in FORMATS])
+        if uploaded and st.button("Import", type="primary"):
+            progress = st.progress(0.0, text="Importing...")
+
+            def show_import_progress(report):
+                progress.progress(
+                    min(uploaded.tell() / max(uploaded.size, 1), 1.0),
+                    text=f"{report['rows']:,} rows · {report['rows_per_second']:,.0f} rows/s"
+                )
+
+            try:
+                report = import_tasks(
+                    io.TextIOWrapper(uploaded, encoding='utf-8-sig', newline=''),
+                    detect_format(uploaded.name),
+                    on_progress=show_import_progress
+                )
+            except Exception as e:
+                st.error(f"Error importing tasks: {str(e)}")
+            else:
+                progress.progress(1.0, text=f"{report['rows']:,} rows in {report['seconds']:.1f}s")
+                st.success(
+                    f"Imported {report['inserted']:,} tasks · {report['duplicates']:,} duplicates skipped · "
+                    f"{report['invalid']:,} invalid rows"
+                )
+                for error in report['errors']:
+                    st.warning(error)
+    with export_col:
+        export_format = st.radio("Export format", ['csv', 'jsonl'], horizontal=True)
+        if st.button("Prepare export"):
+            total = sum(count_tasks_by_priority().values())
+            if total > EXPORT_DOWNLOAD_MAX_ROWS:
+                # The download is held in memory by Streamlit; larger exports go through the CLI
+                st.warning(
+                    f"{total:,} tasks is more than the {EXPORT_DOWNLOAD_MAX_ROWS:,} offered as a download. "
+                    f"Run `python bulk_io.py export tasks.{export_format}` instead."
+                )
             else:
-                st.warning("Could not parse any tasks from the transcript")
+                # Pages are written to disk as they arrive instead of building the file in a string
+                with tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as export_file:
+                    report = export_tasks(export_file, export_format)
+                    export_file.seek(0)
+                    st.download_button(
+                        f"Download {report['rows']:,} tasks",
+                        export_file,
+                        file_name=f"tasks.{export_format}",
+                        mime='text/csv' if export_format == 'csv' else 'application/x-ndjson'
+                    )
+
+# Progress of this session's background jobs
+jobs_active = show_jobs()
+if jobs_active:
+    # Shared OpenAI queue: interactive lines are admitted ahead of transcripts and long lists
+    llm = get_scheduler_stats()
+    st.caption(
+        f"LLM queue: {llm['classes']['interactive']['waiting']} interactive, {llm['classes']['bulk']['waiting']} bulk waiting · "
+        f"Mean wait: {llm['classes']['interactive']['mean_wait_seconds'] * 1000:.0f} ms interactive, "
+        f"{llm['classes']['bulk']['mean_wait_seconds'] * 1000:.0f} ms bulk · Coalesced: {llm['coalesced']} · "
+        f"Rate limited: {llm['rate_limited']} · Limits: {llm['requests_per_minute']:,.0f} requests, "
+        f"{llm['tokens_per_minute']:,.0f} tokens per minute"
+    )
 
 # Display tasks
 st.markdown("### Task Board")
 
-try:
-    tasks = get_all_tasks()
-    if tasks:
-        # Create columns for different priority levels
-        cols = st.columns(4)
-        priority_tasks = {'P1': [], 'P2': [], 'P3': [], 'P4': []}
+# Pages and cards on screen, registered so pushed changes rerun only affected sessions
+board_pages, visible_tasks = {}, {}
+with span('render.board'):
+    try:
+        # Served from the in-process task cache; only refreshes past its staleness bound
+        board_tasks = task_cache.board_snapshot()
+        priority_tasks = {priority: filter_tasks(board_tasks, priority=priority) for priority in PRIORITIES}
+        counts = {priority: len(tasks_list) for priority, tasks_list in priority_tasks.items()}
+        if sum(counts.values()):
+            # Create columns for different priority levels
+            cols = st.columns(4)
+        
+            # Display tasks in columns, one HTML block per column for the current page
+            for i, priority in enumerate(PRIORITIES):
+                with cols[i]:
+                    st.markdown(f"#### {priority} ({counts[priority]})")
+                    if not counts[priority]:
+                        st.markdown("No tasks")
+                        continue
+                
+                    tasks_list, next_cursor = board_page(priority_tasks[priority], priority)
+                    cursors = st.session_state[f"board_cursors_{priority}"]
+                    if not tasks_list and len(cursors) > 1:
+                        # The last cards on this page were deleted; step back a page
+                        cursors.pop()
+                        st.rerun()
+                    prev_col, next_col = st.columns([1, 1])
+                    with prev_col:
+                        if len(cursors) > 1 and st.button("◀ Previous", key=f"prev_{priority}", use_container_width=True):
+                            cursors.pop()
+                            st.rerun()
+                    with next_col:
+                        if next_cursor and st.button("Next ▶", key=f"next_{priority}", use_container_width=True):
+                            cursors.append(next_cursor)
+                            st.rerun()
+                
+                    last = tasks_list[-1]
+                    board_pages[priority] = (cursors[-1], (last['due_date'], last['id']), next_cursor is not None)
+                    st.markdown(column_html(tasks_list), unsafe_allow_html=True)
+                    visible_tasks.update((task['id'], task) for task in tasks_list)
         
-        # Group tasks by priority
-        for task in tasks:
-            priority_tasks[task['priority']].append(task)
+            # One shared selector drives the task actions for every visible card
+            st.markdown("#### Task Actions")
+            select_col, edit_col, delete_col = st.columns([6, 1, 1])
+            with select_col:
+                selected_id = st.selectbox(
+                    "Task",
+                    list(visible_tasks),
+                    format_func=lambda task_id: task_label(visible_tasks[task_id]),
+                    label_visibility="collapsed"
+                )
+            with edit_col:
+                if st.button("✏️ Edit", use_container_width=True):
+                    st.session_state.editing_task_id = selected_id
+            with delete_col:
+                if st.button("🗑️ Delete", use_container_width=True):
+                    delete_task(selected_id)
+                    st.session_state.pop('editing_task_id', None)
+                    st.rerun()
         
-        # Display tasks in columns
-        for i, (priority, tasks_list) in enumerate(priority_tasks.items()):
-            with cols[i]:
-                st.markdown(f"#### {priority}")
-                if not tasks_list:
-                    st.markdown("No tasks")
-                    continue
-                    
-                for task in tasks_list:
-                    with st.container():
-                        # Display task card
-                        st.markdown(f"""
-                        <div class="task-card priority-{task['priority']}">
-                            <div class="task-title">{task['task_name']}</div>
-                            <div class="task-meta">
-                                <div class="task-assignee">👤 {task['assignee']}</div>
-                                <div>🕒 {task['due_date'].strftime('%I:%M %p, %d %B')}</div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Task actions
-                        col1, col2 = st.columns([1, 1])
-                        with col1:
-                            if st.button("✏️", key=f"edit_{task['id']}", help="Edit task"):
-                                st.session_state[f"editing_{task['id']}"] = True
-                        with col2:
-                            if st.button("🗑️", key=f"delete_{task['id']}", help="Delete task"):
-                                delete_task(task['id'])
-                                st.rerun()
-                        
-                        # Edit form
-                        if st.session_state.get(f"editing_{task['id']}", False):
-                            with st.form(key=f"edit_form_{task['id']}"):
-                                new_task_name = st.text_input("Task Name", task['task_name'])
-                                new_assignee = st.text_input("Assignee", task['assignee'])
-                                
-                                date_col, time_col = st.columns(2)
-                                with date_col:
-                                    new_date = st.date_input("Due Date", task['due_date'].date())
-                                with time_col:
-                                    new_time = st.time_input("Due Time", task['due_date'].time())
-                                
-                                new_due_date = datetime.combine(new_date, new_time)
-                                new_priority = st.selectbox(
-                                    "Priority",
-                                    ['P1', 'P2', 'P3', 'P4'],
-                                    index=['P1', 'P2', 'P3', 'P4'].index(task['priority'])
-                                )
-                                
-                                if st.form_submit_button("Save Changes"):
-                                    update_task(task['id'], new_task_name, new_assignee, new_due_date, new_priority)
-                                    del st.session_state[f"editing_{task['id']}"]
-                                    st.rerun()
+            # Edit form, created only for the card being edited
+            task = visible_tasks.get(st.session_state.get('editing_task_id'))
+            if task:
+                with st.form(key=f"edit_form_{task['id']}"):
+                    new_task_name = st.text_input("Task Name", task['task_name'])
+                    new_assignee = st.text_input("Assignee", task['assignee'])
+                
+                    date_col, time_col = st.columns(2)
+                    with date_col:
+                        new_date = st.date_input("Due Date", task['due_date'].date())
+                    with time_col:
+                        new_time = st.time_input("Due Time", task['due_date'].time())
+                
+                    new_due_date = datetime.combine(new_date, new_time)
+                    new_priority = st.selectbox(
+                        "Priority",
+                        PRIORITIES,
+                        index=PRIORITIES.index(task['priority'])
+                    )
+                
+                    if st.form_submit_button("Save Changes"):
+                        update_task(task['id'], new_task_name, new_assignee, new_due_date, new_priority)
+                        del st.session_state.editing_task_id
+                        st.rerun()
+        else:
+            st.info("No tasks yet. Add your first task above!")
+    except Exception as e:
+        st.error(f"Error loading tasks: {str(e)}")
+
+# Workload per assignee, aggregated by the database from incrementally maintained rollups
+st.markdown("### Assignee Dashboard")
+dashboard_invalidation()
+with span('render.dashboard'):
+    dashboard = assignee_dashboard()
+    if dashboard:
+        st.dataframe(
+            [{
+                'Assignee': row['assignee'],
+                **row['open'],
+                'Open': row['open_total'],
+                'Overdue': row['overdue'],
+                'Due by day': row['due_by_day']
+            } for row in dashboard],
+            column_config={
+                'Due by day': st.column_config.BarChartColumn(
+                    f"Due in the next {DASHBOARD_DAYS} days", help="Tasks due on each day, starting today", y_min=0
+                )
+            },
+            hide_index=True,
+            use_container_width=True
+        )
     else:
-        st.info("No tasks yet. Add your first task above!")
-except Exception as e:
-    st.error(f"Error loading tasks: {str(e)}") 
\ No newline at end of file
+        st.caption("No assigned tasks yet.")
+
+if database_probe.done() and database_probe.exception():
+    st.error(f"Error initializing database: {str(database_probe.exception())}")
+    # Probe again on the next rerun instead of keeping a transient failure for the life of the process
+    database_check.clear()
+
+session_id = current_session_id()
+if session_id:
+    board_watchers().watch(session_id, board_pages, visible_tasks)
+
+cache_stats = task_cache.stats()
+freshness = (
+    f"Live updates: {cache_stats['pushed_changes']} pushed" if cache_stats['live']
+    else f"Staleness bound: {cache_stats['max_staleness']:.0f}s"
+)
+st.caption(
+    f"Board reruns served from memory: {cache_stats['cached_reruns']} · Fetched first: {cache_stats['network_reruns']} · "
+    f"Fetches from Supabase: {cache_stats['network_reads']} · "
+    f"{freshness}"
+) 
+
+# Timing breakdown of this rerun
+tracing.finish_rerun(trace)
+if trace:
+    with st.sidebar:
+        st.markdown("### Timing (last rerun)")
+        breakdown = trace.summary()
+        if breakdown:
+            st.table([{'stage': name, **stats} for name, stats in breakdown.items()])
+        else:
+            st.caption("No traced stages ran.")
+
+# Poll background jobs until they finish
+if jobs_active:
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
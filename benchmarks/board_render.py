@@ -0,0 +1,107 @@
+"""Render time of the Task Board against task count.
+
+Compares the per-card layout (one st.markdown card and two buttons per task)
+with the column-block layout from board_view (one HTML block per priority
+column and one shared action selector). Without Streamlit installed only the
+HTML build time is measured.
+
+    python -m benchmarks.board_render [--counts 100 1000 2000] [--repeat 3]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from board_view import column_html
+
+PRIORITIES = ['P1', 'P2', 'P3', 'P4']
+
+
+def make_tasks(count):
+    start = datetime(2025, 6, 18, 9, 0)
+    return [{
+        'id': i,
+        'task_name': f"Follow up on item {i}",
+        'assignee': f"Person{i % 25}",
+        'due_date': start + timedelta(hours=i),
+        'priority': PRIORITIES[i % 4]
+    } for i in range(count)]
+
+
+def per_card_board():
+    """Streamlit script: the per-card layout with two buttons per task."""
+    import streamlit as st
+    from benchmarks.board_render import make_tasks
+    tasks = make_tasks(st.session_state.task_count)
+    cols = st.columns(4)
+    for i, priority in enumerate(['P1', 'P2', 'P3', 'P4']):
+        with cols[i]:
+            for task in (task for task in tasks if task['priority'] == priority):
+                st.markdown(f"<div class='task-card'>{task['task_name']}</div>", unsafe_allow_html=True)
+                col1, col2 = st.columns(2)
+                col1.button("✏️", key=f"edit_{task['id']}")
+                col2.button("🗑️", key=f"delete_{task['id']}")
+
+
+def column_block_board():
+    """Streamlit script: one HTML block per column plus a shared selector."""
+    import streamlit as st
+    from benchmarks.board_render import make_tasks
+    from board_view import column_html, task_label
+    tasks = make_tasks(st.session_state.task_count)
+    by_id = {task['id']: task for task in tasks}
+    cols = st.columns(4)
+    for i, priority in enumerate(['P1', 'P2', 'P3', 'P4']):
+        with cols[i]:
+            st.markdown(column_html([task for task in tasks if task['priority'] == priority]), unsafe_allow_html=True)
+    st.selectbox("Task", list(by_id), format_func=lambda task_id: task_label(by_id[task_id]))
+    st.button("Edit")
+    st.button("Delete")
+
+
+def time_html(count, repeat):
+    tasks = make_tasks(count)
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for priority in PRIORITIES:
+            column_html([task for task in tasks if task['priority'] == priority])
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def time_script(script, count, repeat):
+    from streamlit.testing.v1 import AppTest
+    best = float('inf')
+    for _ in range(repeat):
+        app = AppTest.from_function(script, default_timeout=600)
+        app.session_state.task_count = count
+        started = time.perf_counter()
+        app.run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 500, 1000, 2000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        import streamlit.testing.v1  # noqa: F401
+        with_streamlit = True
+    except ImportError:
+        with_streamlit = False
+        print("streamlit not installed: measuring HTML build time only")
+
+    print(f"{'tasks':>8} {'html build ms':>14} {'per-card ms':>12} {'column-block ms':>16}")
+    for count in args.counts:
+        row = f"{count:>8} {time_html(count, args.repeat) * 1000:>14.2f}"
+        if with_streamlit:
+            row += f" {time_script(per_card_board, count, args.repeat) * 1000:>12.1f}"
+            row += f" {time_script(column_block_board, count, args.repeat) * 1000:>16.1f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
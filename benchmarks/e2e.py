@@ -0,0 +1,133 @@
+"""Offline end-to-end benchmark of parsing and task storage.
+
+Runs parse_task, parse_transcript, add_task and get_all_tasks against the
+local stand-ins in benchmarks/stubs.py, with the tasks table seeded at each
+size, and prints throughput and p50/p95/p99 latencies as JSON. Parse
+operations use fresh inputs each time, so neither the fast path nor the parse
+cache hides the LLM round trip; transcripts hold up to --transcript-sentences
+sentences whatever the table size.
+
+    python -m benchmarks.e2e --output benchmarks/baseline.json
+
+Re-run with the same options and diff against benchmarks/baseline.json to
+spot regressions.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import StubOpenAI, StubPostgrest, use_stubs
+
+DEFAULT_SIZES = [10, 1000, 100000]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure(operation, inputs):
+    """Run operation once per input and summarize its latencies."""
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs:
+        op_started = time.perf_counter()
+        operation(item)
+        latencies.append(time.perf_counter() - op_started)
+    total = time.perf_counter() - started
+    return {
+        'samples': len(latencies),
+        'throughput_per_s': round(len(latencies) / total, 1) if total else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+    }
+
+
+def run(args):
+    # Keep the benchmark's parse cache out of the working tree and start it empty
+    os.environ['PARSE_CACHE_PATH'] = os.path.join(tempfile.mkdtemp(), 'parse_cache.sqlite3')
+    llm = StubOpenAI(latency=args.llm_latency_ms / 1000, error_rate=args.llm_error_rate)
+    db = StubPostgrest(latency=args.db_latency_ms / 1000, error_rate=args.db_error_rate)
+    use_stubs(llm, db)
+
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+    from datetime import datetime, timedelta
+    from database import add_task, get_all_tasks
+    from task_parser import parse_task, parse_transcript
+
+    # Pay for imports, client construction and first connections before measuring
+    parse_task("warm up the parser for rajeev sometime next week")
+    add_task("Warm up", 'Aman', datetime(2025, 6, 18, 9))
+    get_all_tasks()
+
+    results = {}
+    run_id = 0
+    for size in args.sizes:
+        db.seed(size)
+        run_id += 1
+        sentences = min(size, args.transcript_sentences)
+        results[str(size)] = {
+            'parse_task': measure(
+                parse_task,
+                [f"please look into ticket {run_id}-{i} for rajeev sometime next week" for i in range(args.samples)]
+            ),
+            'parse_transcript': measure(
+                parse_transcript,
+                [' '.join(f"Aman take item {run_id}-{n}-{i} by tomorrow 5pm." for i in range(sentences))
+                 for n in range(args.transcript_samples)]
+            ),
+            'add_task': measure(
+                lambda i: add_task(f"Benchmark task {run_id}-{i}", 'Aman', datetime(2025, 6, 18, 9) + timedelta(minutes=i)),
+                range(args.samples)
+            ),
+            'get_all_tasks': measure(lambda _: get_all_tasks(), range(args.read_samples))
+        }
+    llm.close()
+    db.close()
+    return {
+        'config': {
+            'sizes': args.sizes,
+            'samples': args.samples,
+            'read_samples': args.read_samples,
+            'transcript_samples': args.transcript_samples,
+            'transcript_sentences': args.transcript_sentences,
+            'llm_latency_ms': args.llm_latency_ms,
+            'llm_error_rate': args.llm_error_rate,
+            'db_latency_ms': args.db_latency_ms,
+            'db_error_rate': args.db_error_rate
+        },
+        'results': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--samples', type=int, default=20)
+    parser.add_argument('--read-samples', type=int, default=5)
+    parser.add_argument('--transcript-samples', type=int, default=3)
+    parser.add_argument('--transcript-sentences', type=int, default=100)
+    parser.add_argument('--llm-latency-ms', type=float, default=50)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--db-latency-ms', type=float, default=5)
+    parser.add_argument('--db-error-rate', type=float, default=0.0)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2) + '\n'
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report)
+
+
+if __name__ == '__main__':
+    main()
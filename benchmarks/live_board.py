@@ -0,0 +1,132 @@
+"""Board freshness and read load: polling versus the pushed change feed.
+
+Runs the task cache against the stub PostgREST server in two fresh
+processes, once polling (TASK_CACHE_MAX_STALENESS = --staleness) and once
+with a LocalChangeFeed the stub publishes to. Simulated viewers read the
+board every --rerun-ms while another writer inserts tasks straight into the
+table, as a second app process would. Reports the table reads made, how long
+new tasks took to reach the cache, and how many viewer reruns BoardWatchers
+requested compared with rerunning every viewer on every write.
+
+    python -m benchmarks.live_board [--viewers 20] [--seconds 5] [--writes-per-second 10]
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+PAGE_SIZE = 100
+
+
+def child(args, live):
+    from benchmarks.stubs import StubOpenAI, StubPostgrest, use_stubs
+    from change_feed import LocalChangeFeed
+
+    feed = LocalChangeFeed() if live else None
+    db = StubPostgrest(latency=args.db_latency_ms / 1000, feed=feed)
+    db.seed(args.tasks)
+    use_stubs(StubOpenAI(), db)
+
+    import database
+    from live_board import BoardWatchers
+    from task_cache import filter_tasks
+
+    database.task_cache.max_staleness = args.staleness
+    if live:
+        database.start_change_feed(feed)
+
+    written, seen = {}, {}
+
+    def record(upserted=(), removed=(), reset=False):
+        now = time.perf_counter()
+        for task in upserted:
+            if task['id'] in written and task['id'] not in seen:
+                seen[task['id']] = now - written[task['id']]
+
+    watchers = BoardWatchers(rerun=lambda session_id: True)
+    database.task_cache.subscribe(record)
+    database.task_cache.subscribe(watchers.on_change)
+
+    # Every viewer looks at the first page of each priority column
+    tasks = database.task_cache.snapshot()
+    pages, visible = {}, set()
+    for priority in database.PRIORITIES:
+        column = filter_tasks(tasks, priority=priority)
+        page = column[:PAGE_SIZE]
+        visible.update(task['id'] for task in page)
+        pages[priority] = (None, (page[-1]['due_date'], page[-1]['id']), len(column) > PAGE_SIZE) if page else \
+            (None, None, False)
+    for viewer in range(args.viewers):
+        watchers.watch(f"viewer-{viewer}", pages, visible)
+    reads_before = db.reads
+
+    stop = threading.Event()
+
+    def viewer():
+        while not stop.is_set():
+            database.task_cache.snapshot()
+            time.sleep(args.rerun_ms / 1000)
+
+    threads = [threading.Thread(target=viewer, daemon=True) for _ in range(args.viewers)]
+    for thread in threads:
+        thread.start()
+    start = datetime(2025, 1, 1, 9, 0)
+    writes = 0
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        row = {
+            'title': f"Pushed task {writes}",
+            'assignee': f"Person{writes % 50}",
+            'due_date': (start + timedelta(hours=random.randrange(28 * 24))).isoformat(),
+            'priority': f"P{random.randint(1, 4)}"
+        }
+        inserted = db._insert([row], ignore_duplicates=True)
+        written[inserted[0]['id']] = time.perf_counter()
+        writes += 1
+        time.sleep(1 / args.writes_per_second)
+    # Let the last writes arrive
+    time.sleep(args.staleness + 0.5 if not live else 0.5)
+    stop.set()
+
+    lags = sorted(seen.values())
+    return {
+        'table_reads': db.reads - reads_before,
+        'writes': writes,
+        'seen': len(lags),
+        'mean_lag_ms': round(sum(lags) / len(lags) * 1000, 1) if lags else None,
+        'max_lag_ms': round(lags[-1] * 1000, 1) if lags else None,
+        'targeted_reruns': watchers.reruns,
+        'rerun_all_reruns': writes * args.viewers
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--viewers', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writes-per-second', type=float, default=10)
+    parser.add_argument('--rerun-ms', type=float, default=250)
+    parser.add_argument('--staleness', type=float, default=2)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--db-latency-ms', type=float, default=5)
+    parser.add_argument('--child', choices=['poll', 'live'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args, args.child == 'live')))
+        return
+
+    for mode in ('poll', 'live'):
+        result = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.live_board', '--child', mode, *sys.argv[1:]],
+            capture_output=True, text=True, check=True
+        )
+        print(mode, result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    main()
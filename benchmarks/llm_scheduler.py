@@ -0,0 +1,114 @@
+"""Interactive latency under a bulk transcript, with and without the LLM scheduler.
+
+Runs two fresh processes against a stub LLM that enforces
+--tokens-per-minute like OpenAI, once with LLM_SCHEDULER off and once on.
+In each, a long transcript is parsed in the background at BULK priority
+while single task lines arrive every --interval-ms at INTERACTIVE priority.
+Reports interactive latency and failures, the 429s the stub sent, how long
+the transcript took, and the scheduler's queue metrics. Finally a burst of
+identical lines is sent at once to show coalescing.
+
+    python -m benchmarks.llm_scheduler [--tokens-per-minute 30000] [--chunks 24]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def child(args, enabled):
+    os.environ['LLM_SCHEDULER'] = '1' if enabled else '0'
+    os.environ['PARSE_CACHE_PATH'] = os.path.join(tempfile.mkdtemp(), 'parse_cache.sqlite3')
+    from benchmarks.stubs import StubOpenAI, StubPostgrest, use_stubs
+
+    llm = StubOpenAI(latency=args.latency_ms / 1000, tokens_per_minute=args.tokens_per_minute)
+    use_stubs(llm, StubPostgrest())
+
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+    import task_parser
+    from llm_scheduler import BULK, get_scheduler_stats, llm_priority
+
+    # Chunks of about TRANSCRIPT_CHUNK_CHARS each
+    sentences = [f"Person{i % 7} please sort out the backlog item number {i} before friday p{i % 4 + 1}."
+                 for i in range(args.chunks * 24)]
+    transcript = ' '.join(sentences)
+    bulk = {}
+
+    def run_bulk():
+        started = time.perf_counter()
+        with llm_priority(BULK):
+            results = list(task_parser.iter_parse_transcript(transcript))
+        bulk['seconds'] = time.perf_counter() - started
+        bulk['errors'] = sum(1 for task, error in results if error)
+
+    bulk_thread = threading.Thread(target=run_bulk)
+    bulk_thread.start()
+    latencies, failures = [], 0
+    line = 0
+    while bulk_thread.is_alive() and line < args.interactive_lines:
+        started = time.perf_counter()
+        try:
+            task_parser._parse_with_llm(f"please look into ticket {line} for rajeev sometime next week")
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            failures += 1
+        line += 1
+        time.sleep(args.interval_ms / 1000)
+    bulk_thread.join()
+
+    # Identical lines submitted together share one completion
+    requests_before = llm.requests
+    burst = [threading.Thread(target=task_parser._parse_with_llm, args=("please chase the invoice for aman soon",))
+             for _ in range(10)]
+    for thread in burst:
+        thread.start()
+    for thread in burst:
+        thread.join()
+
+    latencies.sort()
+    stats = get_scheduler_stats()
+    return {
+        'interactive_p50_ms': round(latencies[len(latencies) // 2] * 1000) if latencies else None,
+        'interactive_p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000) if latencies else None,
+        'interactive_failed': failures,
+        'interactive_lines': line,
+        'transcript_seconds': round(bulk['seconds'], 1),
+        'transcript_errors': bulk['errors'],
+        'stub_429s': llm.rate_limited,
+        'burst_requests': llm.requests - requests_before,
+        'queue': {name: {
+            'max_waiting': s['max_waiting'], 'mean_wait_ms': round(s['mean_wait_seconds'] * 1000)
+        } for name, s in stats['classes'].items()},
+        'learned_tokens_per_minute': stats['tokens_per_minute']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tokens-per-minute', type=int, default=30000)
+    parser.add_argument('--chunks', type=int, default=24)
+    parser.add_argument('--interactive-lines', type=int, default=40)
+    parser.add_argument('--interval-ms', type=float, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--child', choices=['off', 'on'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args, args.child == 'on')))
+        return
+
+    for mode in ('off', 'on'):
+        result = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.llm_scheduler', '--child', mode, *sys.argv[1:]],
+            capture_output=True, text=True, check=True
+        )
+        print(f"scheduler {mode}:", result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Packed versus one-completion-per-line task parsing against the stub LLM.
+
+Parses the same batch of task lines twice through task_parser.parse_tasks,
+once with a completion per line and once with PACKED_PARSING, and reports
+requests, prompt tokens per task (as counted by the stub) and wall time.
+Lines are worded so the local fast path passes them to the LLM, and each
+mode starts with an empty parse cache.
+
+    python -m benchmarks.packed_parse [--lines 10 50 200] [--latency-ms 300]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.stubs import StubOpenAI, StubPostgrest, use_stubs
+
+
+def make_lines(count, run):
+    return [f"please look into ticket {run}-{i} for rajeev sometime next week p{i % 4 + 1}" for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--ms-per-task', type=float, default=15)
+    args = parser.parse_args()
+
+    os.environ['PARSE_CACHE_PATH'] = os.path.join(tempfile.mkdtemp(), 'parse_cache.sqlite3')
+    llm = StubOpenAI(latency=args.latency_ms / 1000, latency_per_task=args.ms_per_task / 1000)
+    use_stubs(llm, StubPostgrest())
+
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+    import task_parser
+
+    print(f"{'lines':>6} {'mode':>7} {'requests':>9} {'prompt tok/task':>16} {'total ms':>9} {'parsed':>7}")
+    for run, count in enumerate(args.lines):
+        for packed in (False, True):
+            task_parser.PACKED_PARSING = packed
+            lines = make_lines(count, f"{run}{'p' if packed else 's'}")
+            requests, prompt_tokens = llm.requests, llm.prompt_tokens
+            started = time.perf_counter()
+            results = task_parser.parse_tasks(lines)
+            elapsed = time.perf_counter() - started
+            print(f"{count:>6} {'packed' if packed else 'single':>7} {llm.requests - requests:>9} "
+                  f"{(llm.prompt_tokens - prompt_tokens) / count:>16.1f} {elapsed * 1000:>9.0f} "
+                  f"{sum(1 for task, _ in results if task):>7}")
+
+    stats = task_parser.get_packing_stats()
+    print(f"\npacked: {stats['prompt_tokens_per_task']:.1f} prompt tokens/task "
+          f"(vs {stats['unpacked_prompt_tokens_per_task']:.1f} unpacked), {stats['retries']} lines retried")
+    llm.close()
+
+
+if __name__ == '__main__':
+    main()
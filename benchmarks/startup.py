@@ -0,0 +1,113 @@
+"""Cold-start cost of the app: module imports and time to first render.
+
+Runs two fresh interpreters. The first imports the modules app.py uses under
+`python -X importtime` and reports the import time of streamlit and of the
+app's own modules, and which heavy client libraries got pulled in eagerly.
+The second runs app.py once with Streamlit's AppTest against the stub
+services from benchmarks/stubs.py (seeded with --tasks tasks) and reports the
+time until the first run finishes, which includes the first board query.
+
+Exits with status 1 when either number is over its target, so it can gate CI.
+
+    python -m benchmarks.startup [--import-target-ms 150] [--render-target-ms 1500]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_MODULES = [
+    'database', 'task_cache', 'board_view', 'tracing', 'task_parser', 'job_queue', 'fast_parser', 'llm_scheduler',
+    'bulk_io', 'live_board', 'change_feed'
+]
+# Libraries that should load on first use, not at import
+LAZY_MODULES = ['httpx', 'openai', 'postgrest']
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_times():
+    """Return ({top-level module: cumulative us}, eagerly imported lazy modules)."""
+    code = 'import streamlit; ' + '; '.join(f'import {module}' for module in APP_MODULES)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative, eager = {}, []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        _, total, indent, name = match.groups()
+        if len(indent) == 1:
+            cumulative[name] = int(total)
+        if name in LAZY_MODULES:
+            eager.append(name)
+    return cumulative, eager
+
+
+def first_render(tasks, db_latency_ms):
+    """Run app.py once in this process and return the seconds the run took."""
+    from benchmarks.stubs import StubOpenAI, StubPostgrest, use_stubs
+
+    tmp = tempfile.mkdtemp()
+    os.environ['PARSE_CACHE_PATH'] = os.path.join(tmp, 'parse_cache.sqlite3')
+    os.environ['JOB_QUEUE_PATH'] = os.path.join(tmp, 'job_queue.sqlite3')
+    db = StubPostgrest(latency=db_latency_ms / 1000)
+    db.seed(tasks)
+    use_stubs(StubOpenAI(), db)
+
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--db-latency-ms', type=float, default=20)
+    parser.add_argument('--import-target-ms', type=float, default=150,
+                        help="budget for importing the app's own modules, excluding streamlit")
+    parser.add_argument('--render-target-ms', type=float, default=1500)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps({'first_render_s': first_render(args.tasks, args.db_latency_ms)}))
+        return
+
+    cumulative, eager = import_times()
+    streamlit_ms = cumulative.get('streamlit', 0) / 1000
+    app_ms = sum(cumulative.get(module, 0) for module in APP_MODULES) / 1000
+    print(f"import streamlit: {streamlit_ms:8.1f} ms")
+    for module in APP_MODULES:
+        print(f"import {module + ':':<13}{cumulative.get(module, 0) / 1000:8.1f} ms")
+    print(f"app modules:      {app_ms:8.1f} ms (target {args.import_target_ms:.0f} ms)")
+    if eager:
+        print(f"imported eagerly: {', '.join(sorted(set(eager)))}")
+
+    child = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child',
+         '--tasks', str(args.tasks), '--db-latency-ms', str(args.db_latency_ms)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    render_ms = json.loads(child.stdout.strip().splitlines()[-1])['first_render_s'] * 1000
+    print(f"first render:     {render_ms:8.1f} ms (target {args.render_target_ms:.0f} ms, {args.tasks} tasks)")
+
+    if app_ms > args.import_target_ms or render_ms > args.render_target_ms:
+        print("startup over target")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
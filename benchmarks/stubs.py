@@ -0,0 +1,365 @@
+"""Local stand-ins for OpenAI and Supabase used by the offline benchmarks.
+
+StubOpenAI serves POST /v1/chat/completions with configurable latency, rate limits and
+error rate, answering with the JSON shape the prompts in task_parser ask for
+and reporting token usage counted with token_count.
+StubPostgrest serves the subset of PostgREST that database.py uses, backed
+by an in-memory tasks table, including the assignee_dashboard function; given a change_feed.LocalChangeFeed it publishes
+every insert, update and delete to it like the schema.sql trigger. Both run on a background thread on 127.0.0.1;
+point the app at them with use_stubs().
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from token_count import count_message_tokens, count_tokens
+
+DEDUP_COLUMNS = ('title', 'assignee', 'due_date', 'priority')
+_PRIORITY_RE = re.compile(r'\b[pP]([1-4])\b')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_NUMBERED_LINE_RE = re.compile(r'^(\d+): (.*)$', re.MULTILINE)
+
+
+class _StubServer:
+    """Threaded HTTP server whose handler delegates to self.handle."""
+
+    def __init__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload, headers = stub.handle(self.command, self.path, self.headers, body)
+                data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _maybe_fail(self, latency, error_rate):
+        with self._lock:
+            self.requests += 1
+        if latency:
+            time.sleep(latency)
+        if error_rate and random.random() < error_rate:
+            with self._lock:
+                self.errors += 1
+            status = random.choice([429, 500, 503])
+            return status, {'message': 'stub error'}, {'Retry-After': '0'}
+        return None
+
+
+class StubOpenAI(_StubServer):
+    """Fake chat-completions endpoint returning task JSON for the user message.
+
+    Each response takes latency seconds plus latency_per_task for every task
+    it returns, like a completion whose length grows with its output.
+
+    With requests_per_minute or tokens_per_minute set, requests are admitted
+    by token buckets like OpenAI's: every response carries x-ratelimit-*
+    headers, and a request over a limit gets a 429 with retry-after instead.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, latency_per_task=0.0,
+                 requests_per_minute=None, tokens_per_minute=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.latency_per_task = latency_per_task
+        self.prompt_tokens = 0
+        self.rate_limited = 0
+        self.limits = {'requests': requests_per_minute, 'tokens': tokens_per_minute}
+        self._levels = {name: float(limit or 0) for name, limit in self.limits.items()}
+        self._levels_updated = time.monotonic()
+        super().__init__()
+
+    def _rate_limit(self, prompt_tokens):
+        """Take one request and prompt_tokens from the buckets; returns (admitted, headers)."""
+        with self._lock:
+            now = time.monotonic()
+            for name, limit in self.limits.items():
+                if limit:
+                    self._levels[name] = min(limit, self._levels[name] + (now - self._levels_updated) * limit / 60)
+            self._levels_updated = now
+            cost = {'requests': 1, 'tokens': prompt_tokens}
+            waits = {
+                name: max(0.0, (cost[name] - self._levels[name]) * 60 / limit)
+                for name, limit in self.limits.items() if limit
+            }
+            admitted = not any(waits.values())
+            if admitted:
+                for name in waits:
+                    self._levels[name] -= cost[name]
+            else:
+                self.rate_limited += 1
+            headers = {}
+            for name in waits:
+                limit = self.limits[name]
+                headers[f'x-ratelimit-limit-{name}'] = str(limit)
+                headers[f'x-ratelimit-remaining-{name}'] = str(max(0, int(self._levels[name])))
+                headers[f'x-ratelimit-reset-{name}'] = f"{(limit - self._levels[name]) * 60 / limit:.3f}s"
+            if not admitted:
+                headers['retry-after'] = f"{max(waits.values()):.3f}"
+        return admitted, headers
+
+    @staticmethod
+    def _task(sentence):
+        match = _PRIORITY_RE.search(sentence)
+        words = _PRIORITY_RE.sub('', sentence).rstrip('.').split()
+        return {
+            'task_name': ' '.join(words[1:-2]) or sentence,
+            'assignee': words[0] if words else 'Someone',
+            'due_date': ' '.join(words[-2:]),
+            'priority': f"P{match.group(1)}" if match else 'P3'
+        }
+
+    def handle(self, method, path, headers, body):
+        failure = self._maybe_fail(self.latency, self.error_rate)
+        if failure:
+            return failure
+        prompt_tokens = count_message_tokens(body['messages'])
+        admitted, rate_headers = self._rate_limit(prompt_tokens)
+        if not admitted:
+            return 429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}}, rate_headers
+        system, user = body['messages'][0]['content'], body['messages'][-1]['content']
+        if 'transcript' in system:
+            content = {'tasks': [self._task(s) for s in _SENTENCE_RE.split(user.strip()) if s]}
+            tasks = len(content['tasks'])
+        elif '"index"' in system:
+            content = {'tasks': [
+                {'index': int(index), **self._task(line)} for index, line in _NUMBERED_LINE_RE.findall(user)
+            ]}
+            tasks = len(content['tasks'])
+        else:
+            content = self._task(user)
+            tasks = 1
+        if self.latency_per_task:
+            time.sleep(self.latency_per_task * tasks)
+        raw = json.dumps(content)
+        completion_tokens = count_tokens(raw)
+        if self.limits['tokens']:
+            with self._lock:
+                self._levels['tokens'] -= completion_tokens
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+        return 200, {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body['model'],
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': raw},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        }, rate_headers
+
+
+class StubPostgrest(_StubServer):
+    """Fake PostgREST /rest/v1/tasks endpoint over an in-memory table."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, feed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.feed = feed
+        self.reads = 0
+        self.rows = {}
+        self.next_id = 1
+        self._keys = None
+        self._table_lock = threading.Lock()
+        super().__init__()
+
+    def seed(self, count, start=datetime(2025, 1, 1, 9, 0)):
+        """Replace the table contents with count synthetic tasks."""
+        with self._table_lock:
+            self.rows = {}
+            self.next_id = 1
+            self._keys = None
+        rows = [{
+            'title': f"Seeded task {i}",
+            'assignee': f"Person{i % 50}",
+            'due_date': start.replace(day=1 + i % 28, hour=9 + i % 9).isoformat(),
+            'priority': f"P{i % 4 + 1}"
+        } for i in range(count)]
+        self._insert(rows, ignore_duplicates=False, publish=False)
+
+    def _insert(self, rows, ignore_duplicates, publish=True):
+        inserted = []
+        with self._table_lock:
+            if self._keys is None:
+                self._keys = {tuple(row[c] for c in DEDUP_COLUMNS) for row in self.rows.values()}
+            keys = self._keys
+            for row in rows:
+                key = tuple(row[c] for c in DEDUP_COLUMNS)
+                if key in keys and ignore_duplicates:
+                    continue
+                keys.add(key)
+                row = {**row, 'id': self.next_id, 'updated_at': datetime.now(timezone.utc).isoformat()}
+                self.rows[self.next_id] = row
+                self.next_id += 1
+                inserted.append(row)
+        if publish:
+            self._publish('INSERT', inserted)
+        return inserted
+
+    def _publish(self, op, rows):
+        if self.feed is not None:
+            for row in rows:
+                self.feed.publish(op, dict(row))
+
+    @staticmethod
+    def _matches(row, column, op, operand):
+        value = row[column]
+        if isinstance(value, int):
+            operand = int(operand)
+        else:
+            value = str(value)
+        if op == 'eq':
+            return value == operand
+        return {'gt': value > operand, 'gte': value >= operand, 'lt': value < operand, 'lte': value <= operand}[op]
+
+    @classmethod
+    def _matches_logic(cls, row, op, conditions):
+        """Evaluate an or=(...)/and(...) filter: comma-separated conditions, nested with parentheses."""
+        parts, depth, start = [], 0, 0
+        for i, char in enumerate(conditions):
+            depth += {'(': 1, ')': -1}.get(char, 0)
+            if char == ',' and depth == 0:
+                parts.append(conditions[start:i])
+                start = i + 1
+        parts.append(conditions[start:])
+        results = []
+        for part in parts:
+            if part.startswith(('and(', 'or(')):
+                inner_op, _, inner = part.partition('(')
+                results.append(cls._matches_logic(row, inner_op, inner[:-1]))
+            else:
+                column, op_name, operand = part.split('.', 2)
+                results.append(cls._matches(row, column, op_name, operand))
+        return any(results) if op == 'or' else all(results)
+
+    @classmethod
+    def _filter(cls, rows, params):
+        for column, values in params.items():
+            if column in ('select', 'order', 'limit', 'offset', 'on_conflict'):
+                continue
+            for value in values:
+                if column in ('or', 'and'):
+                    rows = [row for row in rows if cls._matches_logic(row, column, value[1:-1])]
+                    continue
+                op, _, operand = value.partition('.')
+                if op in ('eq', 'gt', 'gte', 'lt', 'lte'):
+                    rows = [row for row in rows if cls._matches(row, column, op, operand)]
+        return rows
+
+    def _assignee_dashboard(self, now, days):
+        """What the assignee_dashboard function in schema.sql returns, computed from the rows."""
+        now = datetime.fromisoformat(now)
+        dashboard = {}
+        with self._table_lock:
+            self.reads += 1
+            rows = list(self.rows.values())
+        for row in rows:
+            entry = dashboard.setdefault(row['assignee'], {
+                'assignee': row['assignee'], 'p1': 0, 'p2': 0, 'p3': 0, 'p4': 0, 'overdue': 0, 'due_by_day': [0] * days
+            })
+            due_date = datetime.fromisoformat(row['due_date']).replace(tzinfo=None)
+            entry[row['priority'].lower()] += 1
+            entry['overdue'] += due_date < now
+            offset = (due_date.date() - now.date()).days
+            if 0 <= offset < days:
+                entry['due_by_day'][offset] += 1
+        return sorted(dashboard.values(), key=lambda entry: (
+            -(entry['p1'] + entry['p2'] + entry['p3'] + entry['p4']), entry['assignee']
+        ))
+
+    def handle(self, method, path, headers, body):
+        failure = self._maybe_fail(self.latency, self.error_rate)
+        if failure:
+            return failure
+        url = urlsplit(path)
+        params = parse_qs(url.query)
+        if method == 'POST' and url.path.endswith('/rpc/assignee_dashboard'):
+            return 200, self._assignee_dashboard(body['p_now'], body.get('p_days', 14)), {}
+        if not url.path.endswith('/tasks'):
+            return 404, {'message': 'not found'}, {}
+
+        if method == 'POST':
+            rows = body if isinstance(body, list) else [body]
+            inserted = self._insert(rows, 'ignore-duplicates' in headers.get('Prefer', ''))
+            return 201, inserted, {}
+
+        with self._table_lock:
+            rows = self._filter(list(self.rows.values()), params)
+            if method in ('PATCH', 'DELETE'):
+                self._keys = None
+            if method == 'PATCH':
+                for row in rows:
+                    row.update(body, updated_at=datetime.now(timezone.utc).isoformat())
+                self._publish('UPDATE', rows)
+                return 200, rows, {}
+            if method == 'DELETE':
+                for row in rows:
+                    del self.rows[row['id']]
+                self._publish('DELETE', rows)
+                return 200, rows, {}
+            self.reads += 1
+
+        # Like PostgREST, only one order param counts; several columns go in it comma-separated.
+        # Rows tied on every ordered column come back in no particular order, as from Postgres.
+        orders = params['order'][0].split(',') if 'order' in params else []
+        if orders:
+            random.shuffle(rows)
+        for order in reversed(orders):
+            column, _, direction = order.partition('.')
+            rows.sort(key=lambda row: row[column], reverse=direction == 'desc')
+        total = len(rows)
+        if 'limit' in params:
+            rows = rows[:int(params['limit'][0])]
+        columns = params.get('select', ['*'])[0]
+        if columns != '*':
+            columns = columns.split(',')
+            rows = [{column: row[column] for column in columns} for row in rows]
+        return 200, rows, {'Content-Range': f"0-{max(len(rows) - 1, 0)}/{total}"}
+
+
+def use_stubs(openai_stub, postgrest_stub):
+    """Point clients.py at the stub servers; call before the first client is built."""
+    os.environ['OPENAI_BASE_URL'] = f"{openai_stub.url}/v1"
+    os.environ['OPENAI_API_KEY'] = 'stub'
+    os.environ['SUPABASE_URL'] = postgrest_stub.url
+    os.environ['SUPABASE_KEY'] = 'stub'
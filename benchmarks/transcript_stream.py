@@ -0,0 +1,68 @@
+"""Chunked transcript parsing against a stub LLM.
+
+The stub's latency grows with the length of the text it is sent, like a real
+completion, and it returns one task per sentence. Compares sending the whole
+transcript in one request with the chunked pipeline, reporting time to the
+first task and total time.
+
+    python -m benchmarks.transcript_stream [--sentences 20 200] [--ms-per-sentence 20]
+"""
+import argparse
+import json
+import time
+
+import task_parser
+from task_parser import iter_parse_transcript, split_transcript
+
+NAMES = ['Aman', 'Rajeev', 'Shreya', 'Keshav', 'Priya']
+
+
+def make_transcript(sentences):
+    return ' '.join(
+        f"{NAMES[i % len(NAMES)]} you take item {i} by {i % 12 + 1}pm tomorrow."
+        for i in range(sentences)
+    )
+
+
+def make_stub(base_ms, ms_per_sentence):
+    def complete(prompt, text, timeout=None):
+        sentences = split_transcript(text, max_chars=len(text) + 1, overlap=0)[0].split('. ')
+        time.sleep((base_ms + ms_per_sentence * len(sentences)) / 1000)
+        return json.dumps({'tasks': [{
+            'task_name': ' '.join(sentence.split()[3:5]),
+            'assignee': sentence.split()[0],
+            'due_date': ' '.join(sentence.rstrip('.').split()[-2:]),
+            'priority': 'P3'
+        } for sentence in sentences]})
+    return complete
+
+
+def run(text, complete, max_chars):
+    started = time.perf_counter()
+    first = None
+    tasks = 0
+    for task, _ in iter_parse_transcript(text, complete=complete, max_chars=max_chars):
+        if task:
+            first = first or time.perf_counter() - started
+            tasks += 1
+    return first or 0.0, time.perf_counter() - started, tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sentences', type=int, nargs='+', default=[20, 100, 400])
+    parser.add_argument('--base-ms', type=float, default=300)
+    parser.add_argument('--ms-per-sentence', type=float, default=20)
+    args = parser.parse_args()
+
+    complete = make_stub(args.base_ms, args.ms_per_sentence)
+    print(f"{'sentences':>9} {'mode':>8} {'first task ms':>14} {'total ms':>9} {'tasks':>6}")
+    for sentences in args.sentences:
+        text = make_transcript(sentences)
+        for mode, max_chars in (('single', len(text) + 1), ('chunked', task_parser.TRANSCRIPT_CHUNK_CHARS)):
+            first, total, tasks = run(text, complete, max_chars)
+            print(f"{sentences:>9} {mode:>8} {first * 1000:>14.0f} {total * 1000:>9.0f} {tasks:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""HTML rendering for the Task Board.
+
+Each priority column is rendered as a single pre-built HTML block instead of
+one st.markdown card plus two buttons per task, so the number of Streamlit
+widgets per rerun no longer grows with the number of tasks. Task actions go
+through one shared selector in app.py.
+"""
+from html import escape
+
+DUE_DATE_FORMAT = '%I:%M %p, %d %B'
+
+
+def card_html(task):
+    """Return the HTML for one task card."""
+    return (
+        f'<div class="task-card priority-{task["priority"]}">'
+        f'<div class="task-title">{escape(task["task_name"])}</div>'
+        f'<div class="task-meta">'
+        f'<div class="task-assignee">👤 {escape(task["assignee"])}</div>'
+        f'<div>🕒 {task["due_date"].strftime(DUE_DATE_FORMAT)}</div>'
+        f'</div></div>'
+    )
+
+
+def column_html(tasks):
+    """Return one HTML block holding the cards of a priority column."""
+    return ''.join(card_html(task) for task in tasks)
+
+
+def task_label(task):
+    """Short label for a task in the shared action selector."""
+    return f"{task['priority']} · {task['task_name']} · {task['assignee']} · {task['due_date'].strftime(DUE_DATE_FORMAT)}"
@@ -0,0 +1,251 @@
+"""Streaming bulk import and export of tasks as CSV or JSONL, without the LLM.
+
+Migrating from another tracker used to mean pasting rows through parse_task,
+one OpenAI call each. import_tasks() streams an already-structured file
+through a generator pipeline instead:
+
+    read_rows -> validate_rows -> batched -> database.add_tasks
+
+Only one batch of IMPORT_BATCH_SIZE rows is held at a time, so memory stays
+flat however long the file is. A row needs a task name (task_name or title),
+an assignee and a due date: an ISO timestamp or any phrase date_resolver
+understands, resolved against the time the import started. Priority defaults
+to P3. Invalid rows are counted, and the first IMPORT_MAX_ERRORS messages are
+kept. Exact duplicates are skipped by the backend; the near-duplicate check is
+off, because imported rows come from a system of record.
+
+export_tasks() pages through the table with the (due_date, id) cursor of
+database.query_tasks and writes each page as it arrives, so the export is
+ordered by due date and never holds more than one page.
+
+Both call on_progress(report) after every batch and return the report with
+row counts and throughput. From the command line:
+
+    python bulk_io.py import tasks.csv
+    python bulk_io.py export tasks.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from date_resolver import resolve_due_date
+from storage import PRIORITIES
+
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+IMPORT_MAX_ERRORS = 100
+# Largest export the app offers as a download; Streamlit holds a download in memory
+EXPORT_DOWNLOAD_MAX_ROWS = int(os.environ.get('EXPORT_DOWNLOAD_MAX_ROWS', 100000))
+
+# A bare ISO date, which fromisoformat would put at midnight
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+EXPORT_COLUMNS = ('id', 'task_name', 'assignee', 'due_date', 'priority')
+# Accepted input column names for each task field, first match wins
+FIELD_ALIASES = {
+    'task_name': ('task_name', 'title', 'name', 'task'),
+    'assignee': ('assignee', 'owner', 'assigned_to'),
+    'due_date': ('due_date', 'due', 'deadline'),
+    'priority': ('priority',)
+}
+
+
+def detect_format(path):
+    """Return 'csv' or 'jsonl' from a file name's extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown file type {extension or path!r}; use .csv or .jsonl")
+    return FORMATS[extension]
+
+
+def read_rows(file, fmt):
+    """Yield (line_number, row) from an open text file; row is None for a line that is not JSON."""
+    if fmt == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def _field(row, key):
+    for name in FIELD_ALIASES[key]:
+        value = row.get(name)
+        if value not in (None, ''):
+            return str(value).strip()
+    return ''
+
+
+def parse_due_date(text, now):
+    """Normalize an imported due date the way typed dates are.
+
+    ISO timestamps are kept, converted to local time if they carry an
+    offset. Dates without a time (2025-07-04) and any other phrase go through
+    date_resolver, which gives them its default time of day.
+    """
+    if not _ISO_DATE_RE.match(text):
+        try:
+            due_date = datetime.fromisoformat(text)
+        except ValueError:
+            pass
+        else:
+            return due_date.astimezone().replace(tzinfo=None) if due_date.tzinfo else due_date
+    return resolve_due_date(text, now=now)
+
+
+def validate_row(row, now):
+    """Return the task for one input row; raises ValueError if the row is invalid."""
+    if not isinstance(row, dict):
+        raise ValueError("not a JSON object")
+    task = {key: _field(row, key) for key in FIELD_ALIASES}
+    for key in ('task_name', 'assignee', 'due_date'):
+        if not task[key]:
+            raise ValueError(f"missing {key}")
+    try:
+        task['due_date'] = parse_due_date(task['due_date'], now)
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"could not parse date {task['due_date']!r}: {e}")
+    priority = task['priority'].upper() or 'P3'
+    if priority in ('1', '2', '3', '4'):
+        priority = f"P{priority}"
+    if priority not in PRIORITIES:
+        raise ValueError(f"invalid priority {task['priority']!r}")
+    task['priority'] = priority
+    return task
+
+
+def validate_rows(rows, report, now):
+    """Yield valid tasks from (line_number, row) pairs, recording invalid rows in report."""
+    for line_number, row in rows:
+        report['rows'] += 1
+        try:
+            yield validate_row(row, now)
+        except ValueError as e:
+            report['invalid'] += 1
+            if len(report['errors']) < IMPORT_MAX_ERRORS:
+                report['errors'].append(f"line {line_number}: {e}")
+
+
+def batched(items, size):
+    """Yield lists of up to size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _timed(report, started):
+    report['seconds'] = time.perf_counter() - started
+    report['rows_per_second'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+
+def import_tasks(file, fmt, batch_size=IMPORT_BATCH_SIZE, on_progress=None, save=None):
+    """Stream tasks from an open CSV or JSONL text file into the database.
+
+    save(batch) returns (inserted, duplicates) and defaults to
+    database.add_tasks without the near-duplicate check. Returns the report:
+    rows, inserted, duplicates, invalid, errors, seconds and rows_per_second.
+    """
+    if save is None:
+        from database import add_tasks
+
+        def save(batch):
+            return add_tasks(batch, check_near_duplicates=False)
+
+    report = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+    started = time.perf_counter()
+    tasks = validate_rows(read_rows(file, fmt), report, datetime.now())
+    for batch in batched(tasks, batch_size):
+        inserted, duplicates = save(batch)
+        report['inserted'] += len(inserted)
+        report['duplicates'] += len(duplicates)
+        if on_progress:
+            on_progress(_timed(report, started))
+    return _timed(report, started)
+
+
+def export_tasks(file, fmt, batch_size=IMPORT_BATCH_SIZE, on_progress=None, query=None):
+    """Stream every task to an open text file as CSV or JSONL, ordered by due date.
+
+    query(after, limit) returns (tasks, next_cursor) and defaults to
+    database.query_tasks. Returns the report: rows, seconds and rows_per_second.
+    """
+    if query is None:
+        from database import query_tasks
+
+        def query(after, limit):
+            return query_tasks(after=after, limit=limit, columns=['task_name', 'assignee', 'priority'])
+
+    if fmt == 'csv':
+        writer = csv.DictWriter(file, EXPORT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            file.write(json.dumps({column: row[column] for column in EXPORT_COLUMNS}) + '\n')
+
+    report = {'rows': 0}
+    started = time.perf_counter()
+    cursor = None
+    while True:
+        tasks, cursor = query(cursor, batch_size)
+        for task in tasks:
+            write({**task, 'due_date': task['due_date'].isoformat()})
+        report['rows'] += len(tasks)
+        if on_progress:
+            on_progress(_timed(report, started))
+        if cursor is None:
+            return _timed(report, started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import or export tasks as CSV or JSONL.")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('path', help="input or output file; '-' for stdin/stdout (needs --format)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'])
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    last_print = [0.0]
+
+    def progress(report):
+        if report['seconds'] - last_print[0] >= 1:
+            last_print[0] = report['seconds']
+            print(f"{report['rows']:,} rows, {report['rows_per_second']:,.0f} rows/s", file=sys.stderr)
+
+    if args.command == 'import':
+        file = sys.stdin if args.path == '-' else open(args.path, newline='', encoding='utf-8-sig')
+        with file:
+            report = import_tasks(file, fmt, args.batch_size, progress)
+        for error in report['errors']:
+            print(error, file=sys.stderr)
+        print(f"{report['rows']:,} rows: {report['inserted']:,} inserted, {report['duplicates']:,} duplicates, "
+              f"{report['invalid']:,} invalid in {report['seconds']:.1f}s ({report['rows_per_second']:,.0f} rows/s)",
+              file=sys.stderr)
+    else:
+        file = sys.stdout if args.path == '-' else open(args.path, 'w', newline='', encoding='utf-8')
+        with file:
+            report = export_tasks(file, fmt, args.batch_size, progress)
+        print(f"{report['rows']:,} rows exported in {report['seconds']:.1f}s "
+              f"({report['rows_per_second']:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
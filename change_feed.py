@@ -0,0 +1,149 @@
+"""Push-based change feed of the tasks table.
+
+Without a feed every process polls: TaskCache refetches rows changed since
+its high-water mark once it is older than TASK_CACHE_MAX_STALENESS. With a
+feed, one background connection per process receives every insert, update
+and delete as it is committed, and database.py applies the delta to the task
+cache in place, which then stops polling.
+
+The CHANGE_FEED setting selects the feed:
+
+    postgres  LISTEN on CHANGE_FEED_CHANNEL at DATABASE_URL (the Supabase
+              direct connection string); the trigger in schema.sql sends
+              one notification per changed row
+    local     an in-process stand-in that delivers whatever is publish()ed
+              to it, used by the benchmark stubs and tests
+    (unset)   no feed; the cache keeps polling
+
+A feed reports each event as on_change(op, task), where op is 'INSERT',
+'UPDATE' or 'DELETE' and task carries at least 'id', and calls
+on_status(connected) whenever it connects or loses its connection, since
+events may have been missed in between.
+"""
+import json
+import queue
+import threading
+
+from storage import row_to_task
+
+CHANGE_FEED_CHANNEL = 'tasks_changes'
+CHANGE_FEED_RECONNECT_SECONDS = 5
+# How often a waiting listener wakes up to check whether it was stopped
+_POLL_SECONDS = 1.0
+
+
+def decode_event(event):
+    """Turn a notification payload (JSON text or dict) into (op, task)."""
+    if isinstance(event, str):
+        event = json.loads(event)
+    if event['op'] == 'DELETE':
+        return 'DELETE', {'id': event['id']}
+    return event['op'], row_to_task(event['row'])
+
+
+class ChangeFeed:
+    """Base class: delivers decoded events to on_change from a background thread."""
+
+    def __init__(self):
+        self.events = 0
+        self.connected = False
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+        self._on_change = None
+        self._on_status = None
+
+    def start(self, on_change, on_status):
+        """Start delivering events; returns immediately."""
+        self._on_change = on_change
+        self._on_status = on_status
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=_POLL_SECONDS * 2)
+
+    def _deliver(self, event):
+        op, task = decode_event(event)
+        self.events += 1
+        self._on_change(op, task)
+
+    def _set_connected(self, connected):
+        if connected != self.connected:
+            self.connected = connected
+            self._on_status(connected)
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class LocalChangeFeed(ChangeFeed):
+    """In-process stand-in for the Postgres feed."""
+
+    def __init__(self):
+        super().__init__()
+        self._queue = queue.Queue()
+
+    def publish(self, op, row):
+        """Queue one event; row is a tasks table row as in the trigger payload (just 'id' for deletes)."""
+        self._queue.put({'op': op, 'id': row['id'], 'row': None if op == 'DELETE' else row})
+
+    def _run(self):
+        self._set_connected(True)
+        while not self._stopped.is_set():
+            try:
+                event = self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            self._deliver(event)
+
+
+class PostgresChangeFeed(ChangeFeed):
+    """LISTEN/NOTIFY subscriber on a direct Postgres connection, reconnecting on failure."""
+
+    def __init__(self, dsn, channel=CHANGE_FEED_CHANNEL, reconnect_seconds=CHANGE_FEED_RECONNECT_SECONDS):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+
+    def _run(self):
+        import select
+
+        import psycopg2
+        from psycopg2.extensions import quote_ident
+
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {quote_ident(self.channel, conn)}")
+                self._set_connected(True)
+                while not self._stopped.is_set():
+                    if select.select([conn], [], [], _POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._deliver(conn.notifies.pop(0).payload)
+            except Exception as e:
+                self.last_error = str(e)
+                self._set_connected(False)
+                self._stopped.wait(self.reconnect_seconds)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+def create_change_feed(name, dsn=None, channel=CHANGE_FEED_CHANNEL):
+    if not name:
+        return None
+    if name == 'postgres':
+        if not dsn:
+            raise ValueError("CHANGE_FEED=postgres needs DATABASE_URL")
+        return PostgresChangeFeed(dsn, channel)
+    if name == 'local':
+        return LocalChangeFeed()
+    raise ValueError(f"Unknown change feed: {name}")
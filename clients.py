@@ -0,0 +1,166 @@
+"""Shared, lazily built clients for Supabase (PostgREST) and OpenAI.
+
+Clients are created on first use and kept for the life of the process, so
+one pooled HTTP client is reused by every Streamlit session, rerun and
+worker thread. (st.cache_resource is not used because it only returns cached
+values inside a script run, not in the parser's worker threads.) Both
+clients send requests through RetryTransport, which retries 429 and 5xx
+responses with exponential backoff and full jitter (honouring Retry-After)
+and retries failed connects.
+
+httpx, postgrest and openai are imported only when the first client is
+built, so importing this module (and the modules that use it) stays cheap
+and a cold start can paint before any of them load.
+
+Settings are read from the environment, then st.secrets. SUPABASE_URL and
+SUPABASE_KEY have no defaults; get_supabase raises ValueError naming the
+missing one. Point SUPABASE_URL or OPENAI_BASE_URL at a local stand-in
+server to run without the real services.
+"""
+import functools
+import os
+import random
+import threading
+import time
+
+import streamlit as st
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def get_setting(name, default=None):
+    """Read a setting from the environment, then st.secrets, then default."""
+    if name in os.environ:
+        return os.environ[name]
+    try:
+        return st.secrets[name]
+    except (KeyError, FileNotFoundError):
+        return default
+
+
+def _required_setting(name):
+    value = get_setting(name)
+    if not value:
+        raise ValueError(f"{name} is not set; add it to the environment or .streamlit/secrets.toml")
+    return value
+
+
+def _float_setting(name, default):
+    return float(get_setting(name, default))
+
+
+def _int_setting(name, default):
+    return int(get_setting(name, default))
+
+
+@functools.lru_cache(maxsize=None)
+def retry_transport_class():
+    """Return RetryTransport, defined on first use so httpx is imported lazily."""
+    import httpx
+
+    class RetryTransport(httpx.HTTPTransport):
+        """HTTP transport that retries 429 and 5xx responses with jittered exponential backoff."""
+
+        def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=8.0, retry_status_codes=RETRY_STATUS_CODES,
+                     **kwargs):
+            super().__init__(retries=max_retries, **kwargs)
+            self.max_retries = max_retries
+            self.retry_status_codes = retry_status_codes
+            self.backoff_base = backoff_base
+            self.backoff_max = backoff_max
+
+        def _delay(self, attempt, response):
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass
+            return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+        def handle_request(self, request):
+            for attempt in range(self.max_retries + 1):
+                response = super().handle_request(request)
+                if response.status_code not in self.retry_status_codes or attempt == self.max_retries:
+                    return response
+                response.read()
+                response.close()
+                time.sleep(self._delay(attempt, response))
+
+    return RetryTransport
+
+
+def _process_wide(build):
+    """Call build once per process and return the same client from then on."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(build)
+    def get():
+        with lock:
+            if not instance:
+                instance.append(build())
+            return instance[0]
+
+    get.clear = instance.clear
+    return get
+
+
+def build_http_client(retry_status_codes=RETRY_STATUS_CODES, **kwargs):
+    """Build a pooled httpx client with retries and timeouts from the settings."""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=_int_setting('HTTP_POOL_SIZE', 20),
+        max_keepalive_connections=_int_setting('HTTP_KEEPALIVE_CONNECTIONS', 10),
+        keepalive_expiry=_float_setting('HTTP_KEEPALIVE_EXPIRY', 60)
+    )
+    timeout = httpx.Timeout(
+        _float_setting('HTTP_TIMEOUT', 30),
+        connect=_float_setting('HTTP_CONNECT_TIMEOUT', 5)
+    )
+    transport = retry_transport_class()(
+        max_retries=_int_setting('HTTP_MAX_RETRIES', 3),
+        backoff_base=_float_setting('HTTP_BACKOFF_BASE', 0.5),
+        backoff_max=_float_setting('HTTP_BACKOFF_MAX', 8),
+        retry_status_codes=retry_status_codes,
+        limits=limits
+    )
+    return httpx.Client(timeout=timeout, transport=transport, **kwargs)
+
+
+@_process_wide
+def get_supabase():
+    """Return the shared PostgREST client for the Supabase project."""
+    from postgrest import SyncPostgrestClient
+    from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+    class PooledPostgrestClient(SyncPostgrestClient):
+        def create_session(self, base_url, headers, timeout):
+            return build_http_client(base_url=base_url, headers=headers)
+
+    url = _required_setting('SUPABASE_URL').rstrip('/')
+    key = _required_setting('SUPABASE_KEY')
+    return PooledPostgrestClient(
+        f"{url}/rest/v1",
+        headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, 'apikey': key, 'Authorization': f"Bearer {key}"}
+    )
+
+
+@_process_wide
+def get_openai():
+    """Return the shared OpenAI client; retries are handled by the pooled transport.
+
+    While llm_scheduler is on, 429s are left to it, so the shared pause and
+    the rate-limit headers apply to every request.
+    """
+    from openai import OpenAI
+
+    from llm_scheduler import LLM_SCHEDULER
+
+    return OpenAI(
+        api_key=get_setting('OPENAI_API_KEY'),
+        base_url=get_setting('OPENAI_BASE_URL'),
+        max_retries=0,
+        http_client=build_http_client(RETRY_STATUS_CODES - {429} if LLM_SCHEDULER else RETRY_STATUS_CODES)
+    )
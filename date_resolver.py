@@ -0,0 +1,264 @@
+"""Deterministic resolver for the due date phrases returned by the parsers.
+
+Grammar (case-insensitive, tried in table order, first match wins):
+
+    due       := [date] [time] | [time] [date]
+    date      := relative | weekday | month-day | day-month | ordinal | iso
+    relative  := "today" | "tonight" | "eod" | "end of day"
+               | "tomorrow" | "tmrw" | "tmr" | "day after tomorrow"
+               | "next week" | "in" N ("day" | "week")["s"]
+    weekday   := ["next" | "this" | "coming"] ("monday" | "mon" | ... | "sunday" | "sun")
+    month-day := month DAY[ord] [[","] YEAR]          e.g. "june 20th", "jun 20, 2025"
+    day-month := DAY[ord] ["of"] month [[","] YEAR]   e.g. "20th june", "20 of june"
+    ordinal   := "the" DAY ord                         e.g. "the 20th" (current month)
+    iso       := YYYY "-" MM "-" DD
+    time      := H[":"MM] ("am" | "pm") | HH":"MM | "at" H
+               | "noon" | "midnight" | "morning" | "afternoon" | "evening"
+               | "tonight" | "eod" | "end of day"
+
+Semantics:
+    - A bare weekday is the next occurrence on or after today; "next <weekday>"
+      is the next occurrence strictly after today.
+    - Dates without a year use the current year, dates without a month use
+      the current month.
+    - Without a time the due time defaults to 9:00 AM; "tonight" defaults to
+      8:00 PM and "eod"/"end of day" to 5:00 PM.
+    - Phrases outside the grammar fall back to dateutil's fuzzy parser.
+
+All patterns are compiled once at import, so resolving a phrase takes a few
+microseconds. GOLDEN_CASES pins the expected output for a fixed reference
+time; run `python date_resolver.py` to check it.
+"""
+from datetime import datetime, timedelta
+import re
+
+from tracing import span
+
+DEFAULT_HOUR = 9
+
+WEEKDAYS = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tue': 1, 'tues': 1,
+    'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thu': 3, 'thur': 3, 'thurs': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6,
+}
+
+MONTHS = {
+    'january': 1, 'jan': 1,
+    'february': 2, 'feb': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8,
+    'september': 9, 'sep': 9, 'sept': 9,
+    'october': 10, 'oct': 10,
+    'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+
+NUMBER_WORDS = {'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7}
+
+# Named times of day as (hour, minute)
+NAMED_TIMES = {
+    'noon': (12, 0),
+    'midnight': (23, 59),
+    'morning': (9, 0),
+    'afternoon': (14, 0),
+    'evening': (18, 0),
+    'tonight': (20, 0),
+    'eod': (17, 0),
+    'end of day': (17, 0),
+}
+
+_WEEKDAY = '|'.join(sorted(WEEKDAYS, key=len, reverse=True))
+_MONTH = '|'.join(sorted(MONTHS, key=len, reverse=True))
+_ORD = r'(?:st|nd|rd|th)'
+
+_CLOCK_RE = re.compile(
+    r'\b(?P<h12>\d{1,2})(?::(?P<m12>\d{2}))?\s*(?P<period>[ap])\.?m\b\.?'
+    r'|\b(?P<h24>\d{1,2}):(?P<m24>\d{2})\b'
+    r'|\bat\s+(?P<hat>\d{1,2})\b(?!\s*(?:' + _ORD + r'|:))'
+)
+_NAMED_TIME_RE = re.compile(r'\b(' + '|'.join(NAMED_TIMES) + r')\b')
+_FILLER_RE = re.compile(r'\b(?:by|at|on|before|due|until|till)\b|[\s,.]')
+
+
+def _relative_days(days):
+    return lambda match, now: now + timedelta(days=days)
+
+
+def _in_n(match, now):
+    count = match.group(1)
+    count = NUMBER_WORDS[count] if count in NUMBER_WORDS else int(count)
+    unit = 7 if match.group(2) == 'week' else 1
+    return now + timedelta(days=count * unit)
+
+
+def _weekday(match, now):
+    modifier, name = match.group(1), match.group(2)
+    ahead = (WEEKDAYS[name] - now.weekday()) % 7
+    if modifier == 'next' and ahead == 0:
+        ahead = 7
+    return now + timedelta(days=ahead)
+
+
+def _calendar(day, month, year, now):
+    return now.replace(year=int(year) if year else now.year, month=month, day=int(day))
+
+
+def _month_day(match, now):
+    return _calendar(match.group(2), MONTHS[match.group(1)], match.group(3), now)
+
+
+def _day_month(match, now):
+    return _calendar(match.group(1), MONTHS[match.group(2)], match.group(3), now)
+
+
+def _ordinal(match, now):
+    return now.replace(day=int(match.group(1)))
+
+
+def _iso(match, now):
+    return now.replace(year=int(match.group(1)), month=int(match.group(2)), day=int(match.group(3)))
+
+
+# Date rules in priority order
+DATE_RULES = [
+    (re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b'), _iso),
+    (re.compile(r'\bday after (?:tomorrow|tmrw|tmr)\b'), _relative_days(2)),
+    (re.compile(r'\b(?:tomorrow|tmrw|tmr)\b'), _relative_days(1)),
+    (re.compile(r'\b(?:today|tonight|eod|end of day)\b'), _relative_days(0)),
+    (re.compile(r'\bnext week\b'), _relative_days(7)),
+    (re.compile(r'\bin\s+(\d+|' + '|'.join(NUMBER_WORDS) + r')\s+(day|week)s?\b'), _in_n),
+    (re.compile(r'\b(?:(next|this|coming)\s+)?(' + _WEEKDAY + r')\b'), _weekday),
+    (re.compile(r'\b(' + _MONTH + r')\.?\s+(\d{1,2})' + _ORD + r'?\b(?:,?\s+(\d{4})\b)?'), _month_day),
+    (re.compile(r'\b(\d{1,2})' + _ORD + r'?\s+(?:of\s+)?(' + _MONTH + r')\b\.?(?:,?\s+(\d{4})\b)?'), _day_month),
+    (re.compile(r'\bthe\s+(\d{1,2})' + _ORD + r'\b'), _ordinal),
+]
+
+
+def _resolve_time(text):
+    """Return (hour, minute, text_without_time) or (None, None, text)."""
+    match = _CLOCK_RE.search(text)
+    if match:
+        if match.group('h12'):
+            hour = int(match.group('h12'))
+            minute = int(match.group('m12') or 0)
+            if match.group('period') == 'p' and hour != 12:
+                hour += 12
+            elif match.group('period') == 'a' and hour == 12:
+                hour = 0
+        elif match.group('h24'):
+            hour, minute = int(match.group('h24')), int(match.group('m24'))
+        else:
+            hour, minute = int(match.group('hat')), 0
+        if hour > 23 or minute > 59:
+            raise ValueError(f"Invalid time: {match.group(0)}")
+        return hour, minute, text[:match.start()] + ' ' + text[match.end():]
+
+    match = _NAMED_TIME_RE.search(text)
+    if match:
+        hour, minute = NAMED_TIMES[match.group(1)]
+        return hour, minute, text[:match.start()] + ' ' + text[match.end():]
+    return None, None, text
+
+
+def resolve_due_date(text, now=None, fuzzy=True):
+    """Resolve a natural language due date phrase to a datetime.
+
+    With fuzzy=False, phrases outside the grammar are rejected instead of
+    being handed to dateutil. Raises ValueError if the phrase cannot be
+    resolved.
+    """
+    if now is None:
+        now = datetime.now()
+    text = ' '.join(text.lower().split())
+
+    hour, minute, date_text = _resolve_time(text)
+    base_date = None
+    for pattern, handler in DATE_RULES:
+        match = pattern.search(date_text)
+        if match:
+            base_date = handler(match, now)
+            break
+
+    if base_date is None:
+        if hour is not None and not _FILLER_RE.sub('', date_text):
+            # A time on its own means today
+            base_date = now
+        elif not fuzzy:
+            raise ValueError(f"Unrecognised date: {text}")
+        else:
+            from dateutil import parser
+            with span('date.dateutil_fallback'):
+                base_date = parser.parse(date_text, fuzzy=True, default=now)
+
+    if hour is None:
+        hour, minute = DEFAULT_HOUR, 0
+    return base_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+# Reference time for the golden corpus: Wednesday 18 June 2025, 10:30 AM
+GOLDEN_NOW = datetime(2025, 6, 18, 10, 30)
+
+GOLDEN_CASES = [
+    ('today', datetime(2025, 6, 18, 9, 0)),
+    ('today 5pm', datetime(2025, 6, 18, 17, 0)),
+    ('Today at 5pm', datetime(2025, 6, 18, 17, 0)),
+    ('tonight', datetime(2025, 6, 18, 20, 0)),
+    ('tonight 11pm', datetime(2025, 6, 18, 23, 0)),
+    ('eod', datetime(2025, 6, 18, 17, 0)),
+    ('end of day', datetime(2025, 6, 18, 17, 0)),
+    ('by eod tomorrow', datetime(2025, 6, 19, 17, 0)),
+    ('tomorrow', datetime(2025, 6, 19, 9, 0)),
+    ('tomorrow 5pm', datetime(2025, 6, 19, 17, 0)),
+    ('10pm tomorrow', datetime(2025, 6, 19, 22, 0)),
+    ('tomorrow at 3:30 PM', datetime(2025, 6, 19, 15, 30)),
+    ('tmrw 12am', datetime(2025, 6, 19, 0, 0)),
+    ('tomorrow 12pm', datetime(2025, 6, 19, 12, 0)),
+    ('tomorrow noon', datetime(2025, 6, 19, 12, 0)),
+    ('tomorrow morning', datetime(2025, 6, 19, 9, 0)),
+    ('tomorrow evening', datetime(2025, 6, 19, 18, 0)),
+    ('day after tomorrow 15:00', datetime(2025, 6, 20, 15, 0)),
+    ('next week', datetime(2025, 6, 25, 9, 0)),
+    ('next week 4pm', datetime(2025, 6, 25, 16, 0)),
+    ('in 3 days', datetime(2025, 6, 21, 9, 0)),
+    ('in two weeks', datetime(2025, 7, 2, 9, 0)),
+    ('Wednesday', datetime(2025, 6, 18, 9, 0)),
+    ('next Wednesday', datetime(2025, 6, 25, 9, 0)),
+    ('Friday 3pm', datetime(2025, 6, 20, 15, 0)),
+    ('by friday', datetime(2025, 6, 20, 9, 0)),
+    ('this fri 6 pm', datetime(2025, 6, 20, 18, 0)),
+    ('next Monday', datetime(2025, 6, 23, 9, 0)),
+    ('mon at 10', datetime(2025, 6, 23, 10, 0)),
+    ('tuesday afternoon', datetime(2025, 6, 24, 14, 0)),
+    ('11pm 20th June', datetime(2025, 6, 20, 23, 0)),
+    ('20th June', datetime(2025, 6, 20, 9, 0)),
+    ('June 20', datetime(2025, 6, 20, 9, 0)),
+    ('june 20th 2026 5:15pm', datetime(2026, 6, 20, 17, 15)),
+    ('1st of July', datetime(2025, 7, 1, 9, 0)),
+    ('Aug 3, 2025 at 9', datetime(2025, 8, 3, 9, 0)),
+    ('the 25th', datetime(2025, 6, 25, 9, 0)),
+    ('the 25th 2pm', datetime(2025, 6, 25, 14, 0)),
+    ('2025-07-04', datetime(2025, 7, 4, 9, 0)),
+    ('2025-07-04 18:45', datetime(2025, 7, 4, 18, 45)),
+    ('5pm', datetime(2025, 6, 18, 17, 0)),
+    ('by 11:30 am', datetime(2025, 6, 18, 11, 30)),
+    ('midnight', datetime(2025, 6, 18, 23, 59)),
+]
+
+
+if __name__ == '__main__':
+    failures = 0
+    for phrase, expected in GOLDEN_CASES:
+        actual = resolve_due_date(phrase, now=GOLDEN_NOW)
+        if actual != expected:
+            failures += 1
+            print(f"FAIL {phrase!r}: expected {expected}, got {actual}")
+    print(f"{len(GOLDEN_CASES) - failures}/{len(GOLDEN_CASES)} golden cases passed")
+    raise SystemExit(1 if failures else 0)
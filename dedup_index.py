@@ -0,0 +1,116 @@
+"""In-memory near-duplicate index for tasks.
+
+Exact dedup in the backend only catches identical rows, so "Finish landing
+page" and "finish the landing page" were both stored. NearDuplicateIndex keeps
+character trigram sets of normalized task names per assignee, with an
+inverted index from trigram to task, so a lookup only scores tasks that share
+trigrams with the candidate. Two tasks for the same assignee are
+near-duplicates when the Jaccard similarity of their trigram sets is at least
+DEDUP_SIMILARITY_THRESHOLD and their due dates are within
+DEDUP_DUE_TOLERANCE_HOURS of each other. Numbers in the names must match
+exactly, so "Review PR 124" and "Review PR 125" stay separate tasks however
+similar the rest of the name is.
+
+database.py keeps the index in step with the task cache (full reloads,
+incremental refreshes and write-through updates) and consults it before
+every insert.
+"""
+import os
+import re
+import threading
+from datetime import timedelta
+
+DEDUP_SIMILARITY_THRESHOLD = float(os.environ.get('DEDUP_SIMILARITY_THRESHOLD', 0.75))
+DEDUP_DUE_TOLERANCE_HOURS = float(os.environ.get('DEDUP_DUE_TOLERANCE_HOURS', 24))
+
+STOPWORDS = {'a', 'an', 'the', 'to', 'for', 'of', 'on', 'and', 'please'}
+_WORD_RE = re.compile(r'\w+')
+_NUMBER_RE = re.compile(r'\d+')
+
+
+def normalize_name(name):
+    """Lowercase a task name and drop punctuation and filler words."""
+    return ' '.join(word for word in _WORD_RE.findall(name.lower()) if word not in STOPWORDS)
+
+
+def numbers(name):
+    """The digit runs in a task name, in order; ("1", "0") for "Benchmark task 1-0"."""
+    return tuple(str(int(number)) for number in _NUMBER_RE.findall(name))
+
+
+def trigrams(name):
+    padded = f"  {normalize_name(name)} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class NearDuplicateIndex:
+    """Per-assignee trigram index over task names."""
+
+    def __init__(self, threshold=DEDUP_SIMILARITY_THRESHOLD, due_tolerance_hours=DEDUP_DUE_TOLERANCE_HOURS):
+        self.threshold = threshold
+        self.due_tolerance = timedelta(hours=due_tolerance_hours)
+        self._lock = threading.Lock()
+        self._entries = {}    # task id -> (assignee key, trigrams, due_date, numbers)
+        self._postings = {}   # assignee key -> {trigram: set of task ids}
+
+    def _add(self, task):
+        self._remove(task['id'])
+        assignee = task['assignee'].lower()
+        grams = trigrams(task['task_name'])
+        self._entries[task['id']] = (
+            assignee, grams, task['due_date'].replace(tzinfo=None), numbers(task['task_name'])
+        )
+        postings = self._postings.setdefault(assignee, {})
+        for gram in grams:
+            postings.setdefault(gram, set()).add(task['id'])
+
+    def _remove(self, task_id):
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        assignee, grams = entry[:2]
+        postings = self._postings[assignee]
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del postings[gram]
+
+    def apply(self, upserted=(), removed=(), reset=False):
+        """Apply task set changes; reset drops everything before adding upserted."""
+        with self._lock:
+            if reset:
+                self._entries = {}
+                self._postings = {}
+            for task_id in removed:
+                self._remove(task_id)
+            for task in upserted:
+                if {'id', 'task_name', 'assignee', 'due_date'} <= task.keys():
+                    self._add(task)
+
+    def find_duplicate(self, task):
+        """Return the id of a stored near-duplicate of task, or None."""
+        grams = trigrams(task['task_name'])
+        task_numbers = numbers(task['task_name'])
+        due_date = task['due_date'].replace(tzinfo=None)
+        with self._lock:
+            postings = self._postings.get(task['assignee'].lower())
+            if not postings or not grams:
+                return None
+            shared = {}
+            for gram in grams:
+                for task_id in postings.get(gram, ()):
+                    shared[task_id] = shared.get(task_id, 0) + 1
+            best_id, best_score = None, self.threshold
+            for task_id, count in shared.items():
+                _, other, other_due, other_numbers = self._entries[task_id]
+                if other_numbers != task_numbers:
+                    continue
+                score = count / (len(grams) + len(other) - count)
+                if score >= best_score and abs(other_due - due_date) <= self.due_tolerance:
+                    best_id, best_score = task_id, score
+            return best_id
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,114 @@
+"""Rule-based extraction for simple task lines, tried before the OpenAI call.
+
+Handles lines shaped like the examples in parse_task's prompt:
+
+    <task words> [to|for] <Assignee> [by|on|at] <due date phrase> [P1-P4]
+
+The due date phrase is the longest run of date/time words at the end of the
+line and must resolve under date_resolver's grammar without fuzzy fallback.
+Each extraction carries a confidence score; callers only trust results at or
+above FAST_PATH_THRESHOLD and send everything else to the LLM. Only a line
+ending in a known assignee can reach the threshold: any other capitalized
+word ("Email John Smith", "Book flights to Paris") is too often not a person.
+"""
+import re
+import threading
+
+from date_resolver import MONTHS, NAMED_TIMES, NUMBER_WORDS, WEEKDAYS, resolve_due_date
+
+FAST_PATH_THRESHOLD = 0.8
+
+DATE_WORDS = (
+    set(WEEKDAYS) | set(MONTHS) | set(NUMBER_WORDS) | set(NAMED_TIMES)
+    | {'today', 'tomorrow', 'tmrw', 'tmr', 'next', 'this', 'coming', 'week', 'weeks',
+       'day', 'days', 'after', 'end', 'of', 'the', 'in', 'am', 'pm'}
+)
+FILLER_WORDS = {'by', 'at', 'on', 'before', 'due', 'until', 'till'}
+LINK_WORDS = {'to', 'for'}
+
+_DATE_TOKEN_RE = re.compile(
+    r'\d{1,2}(?::\d{2})?(?:[ap]\.?m\.?)?|\d{1,2}(?:st|nd|rd|th)|\d{4}(?:-\d{2}-\d{2})?'
+)
+_PRIORITY_RE = re.compile(r'\b[pP]([1-4])\b')
+_NAME_RE = re.compile(r"^[A-Z][a-zA-Z'-]*$")
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _is_date_token(token):
+    word = token.lower().strip(',.')
+    return word in DATE_WORDS or word in FILLER_WORDS or bool(_DATE_TOKEN_RE.fullmatch(word))
+
+
+def extract_task(text, known_assignees=()):
+    """Extract a task from a simple line without calling the LLM.
+
+    Returns (task, confidence). task is None when the line does not fit the
+    pattern at all.
+    """
+    priority = 'P3'
+    match = _PRIORITY_RE.search(text)
+    if match:
+        priority = f"P{match.group(1)}"
+        text = text[:match.start()] + text[match.end():]
+
+    words = text.split()
+    split_at = len(words)
+    while split_at > 0 and _is_date_token(words[split_at - 1]):
+        split_at -= 1
+    date_words = words[split_at:]
+    words = words[:split_at]
+    if not words or not any(w.lower().strip(',.') not in FILLER_WORDS for w in date_words):
+        return None, 0.0
+
+    try:
+        due_date = resolve_due_date(' '.join(date_words), fuzzy=False)
+    except ValueError:
+        return None, 0.0
+
+    known = {name.lower(): name for name in known_assignees}
+    assignee = words[-1].strip(',.')
+    if assignee.lower() in known:
+        assignee = known[assignee.lower()]
+        confidence = 0.8
+    elif _NAME_RE.match(assignee) and len(words) > 1:
+        # At most 0.75 with the task-words bonus below, under FAST_PATH_THRESHOLD
+        confidence = 0.55
+    else:
+        return None, 0.0
+
+    task_words = words[:-1]
+    while task_words and task_words[-1].lower() in LINK_WORDS:
+        task_words.pop()
+    if not task_words:
+        return None, 0.0
+    confidence += 0.2 if len(task_words) > 1 else 0.1
+
+    return {
+        'task_name': ' '.join(task_words).strip(' ,.'),
+        'assignee': assignee,
+        'due_date': due_date,
+        'priority': priority
+    }, round(confidence, 2)
+
+
+def try_fast_parse(text, known_assignees=(), threshold=FAST_PATH_THRESHOLD):
+    """Return the locally extracted task if confident enough, else None.
+
+    Updates the hit/miss counters either way.
+    """
+    task, confidence = extract_task(text, known_assignees)
+    hit = task is not None and confidence >= threshold
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'] += 1
+    return task if hit else None
+
+
+def get_fast_path_stats():
+    """Return fast path hit and miss counters with the hit rate."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
@@ -0,0 +1,239 @@
+"""Durable background queue for parsing and saving tasks.
+
+Submitting a job only writes one row to a local SQLite file, so the Streamlit
+script thread returns immediately however large the input is. A pool of
+worker threads claims queued jobs, parses them (task lines or a transcript)
+and records progress that app.py polls. Tasks are saved with
+database.add_tasks as lines and chunks finish, in batches of up to
+JOB_SAVE_BATCH_SIZE at most JOB_SAVE_INTERVAL seconds apart, so cards appear
+on the board while a long job is still running.
+
+Job IDs are derived from the job kind and its normalized text, so submitting
+the same input while it is still queued or running returns the existing job
+instead of adding a second one. A job that raises is retried with jittered
+exponential backoff up to JOB_MAX_ATTEMPTS times; lines that merely fail to
+parse are reported in the result instead. A retry parses the input again, and
+tasks an earlier attempt already saved are skipped as duplicates and still
+reported as added. Jobs left running by a crashed
+process are queued again on startup. Done and failed jobs are deleted once
+they are older than JOB_RETENTION_SECONDS, on startup and on every submit,
+so the file stays small.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from parse_cache import normalize_text
+
+JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH', '.job_queue.sqlite3')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_BACKOFF_BASE = float(os.environ.get('JOB_BACKOFF_BASE', 2))
+# Parsed tasks are saved once this many are pending or this many seconds have passed
+JOB_SAVE_BATCH_SIZE = int(os.environ.get('JOB_SAVE_BATCH_SIZE', 100))
+JOB_SAVE_INTERVAL = float(os.environ.get('JOB_SAVE_INTERVAL', 0.5))
+# How long finished jobs are kept for sessions to pick up their results
+JOB_RETENTION_SECONDS = float(os.environ.get('JOB_RETENTION_SECONDS', 24 * 3600))
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def make_job_id(kind, text):
+    return hashlib.sha256(f"{kind}\0{normalize_text(text)}".encode('utf-8')).hexdigest()[:16]
+
+
+def _run_tasks_job(payload, save, report):
+    from llm_scheduler import BULK, INTERACTIVE, LLM_INTERACTIVE_MAX_LINES, llm_priority
+    from task_parser import iter_parse_tasks
+
+    lines = payload['lines']
+    errors = []
+    # A few lines typed in are served ahead of transcripts and long lists
+    with llm_priority(BULK if len(lines) > LLM_INTERACTIVE_MAX_LINES else INTERACTIVE):
+        for done, (_, text, task, error) in enumerate(
+                iter_parse_tasks(lines, known_assignees=payload.get('known_assignees', ())), start=1):
+            if task:
+                save(task)
+            else:
+                errors.append(f"{text}: {error}")
+            report(done, len(lines))
+    return errors
+
+
+def _run_transcript_job(payload, save, report):
+    from llm_scheduler import BULK, llm_priority
+    from task_parser import iter_parse_transcript
+
+    found, errors = 0, []
+    with llm_priority(BULK):
+        for task, error in iter_parse_transcript(payload['text']):
+            if task:
+                save(task)
+                found += 1
+            else:
+                errors.append(error)
+            report(found, None)
+    return errors
+
+
+JOB_HANDLERS = {
+    'tasks': _run_tasks_job,
+    'transcript': _run_transcript_job,
+}
+
+
+class JobQueue:
+    """SQLite-backed job queue with a lazily started worker pool."""
+
+    def __init__(self, path=JOB_QUEUE_PATH, workers=JOB_WORKERS, max_attempts=JOB_MAX_ATTEMPTS,
+                 backoff_base=JOB_BACKOFF_BASE, retention_seconds=JOB_RETENTION_SECONDS, handlers=None):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.retention_seconds = retention_seconds
+        self.handlers = handlers or JOB_HANDLERS
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                total INTEGER,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_status_next_run ON jobs (status, next_run_at)')
+        # Jobs that were running when the last process died start over
+        self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        self._prune(time.time())
+
+    def submit(self, kind, text, payload):
+        """Queue a job and return its ID; an identical active job is reused."""
+        job_id = make_job_id(kind, text)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None or row['status'] not in ACTIVE_STATUSES:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO jobs (id, kind, payload, status, next_run_at, created_at, updated_at) '
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload), now, now, now)
+                )
+            self._prune(now)
+        self._ensure_workers()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return a job's status, progress and result as a dict, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, kind, status, attempts, done, total, result, error FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def _prune(self, now):
+        """Delete done and failed jobs last updated more than retention_seconds ago."""
+        self._conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (now - self.retention_seconds,)
+        )
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name='job-worker', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _claim(self):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, payload, attempts, result FROM jobs WHERE status = 'queued' AND next_run_at <= ? "
+                'ORDER BY created_at LIMIT 1', (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, row['id'])
+            )
+            return row
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _work(self):
+        while True:
+            job = self._claim()
+            if job is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        from database import add_tasks
+
+        # Saved so far, kept across attempts so a retry still reports what an earlier one added
+        result = json.loads(job['result']) if job['result'] else {'inserted': [], 'duplicates': [], 'errors': []}
+        saved_before = set(result['inserted'])
+        result['duplicates'] = []
+        pending = []
+        last_save = [time.monotonic()]
+
+        def flush():
+            if pending:
+                inserted, duplicates = add_tasks(pending)
+                pending.clear()
+                result['inserted'].extend(task['task_name'] for task in inserted)
+                result['duplicates'].extend(
+                    task['task_name'] for task in duplicates if task['task_name'] not in saved_before
+                )
+            last_save[0] = time.monotonic()
+
+        def report(done, total):
+            if len(pending) >= JOB_SAVE_BATCH_SIZE or time.monotonic() - last_save[0] >= JOB_SAVE_INTERVAL:
+                flush()
+                self._update(job['id'], done=done, total=total, result=json.dumps(result))
+            else:
+                self._update(job['id'], done=done, total=total)
+
+        try:
+            result['errors'] = self.handlers[job['kind']](json.loads(job['payload']), pending.append, report)
+            flush()
+        except Exception as e:
+            attempts = job['attempts'] + 1
+            if attempts >= self.max_attempts:
+                self._update(job['id'], status='failed', error=str(e), result=json.dumps(result))
+            else:
+                delay = random.uniform(0.5, 1.0) * self.backoff_base ** attempts
+                self._update(job['id'], status='queued', error=str(e), result=json.dumps(result),
+                             next_run_at=time.time() + delay)
+            return
+        self._update(job['id'], status='done', error=None, result=json.dumps(result))
@@ -0,0 +1,101 @@
+"""Targeted reruns of the sessions whose visible Task Board cards changed.
+
+With a change feed the task cache changes while no session is running. Each
+session registers the pages it is showing with BoardWatchers.watch() on
+every run. BoardWatchers subscribes to the task cache, and on each change it
+asks only the affected sessions to rerun: those showing an updated or deleted
+task, or a page that a new or moved task falls into. Column counts in the
+headers catch up on the next rerun.
+
+Reruns are requested through the Streamlit runtime, the same way Streamlit
+reruns a session when its source file changes. That uses private runtime
+internals, so a failure is logged and the session simply waits for its own
+next run.
+"""
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+
+def current_session_id():
+    """Id of the Streamlit session running the current script, or None outside one."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def request_rerun(session_id):
+    """Ask a connected session to rerun; returns False when it is gone or cannot be reached."""
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return False
+    try:
+        # Private runtime internals, which may change between Streamlit releases
+        info = Runtime.instance()._session_mgr.get_active_session_info(session_id)
+        if info is None:
+            return False
+        info.session.request_rerun(info.session._client_state)
+    except Exception:
+        _logger.exception("Could not rerun session %s", session_id)
+        return False
+    return True
+
+
+class BoardWatchers:
+    """Per-session record of the visible board pages, driving targeted reruns."""
+
+    def __init__(self, rerun=request_rerun):
+        self.rerun = rerun
+        self.reruns = 0
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def watch(self, session_id, pages, visible_ids):
+        """Record what a session shows.
+
+        pages maps each priority column to (after, last, has_more): the
+        page's starting cursor, the (due_date, id) key of its last card, and
+        whether more cards follow it.
+        """
+        with self._lock:
+            self._views[session_id] = (pages, frozenset(visible_ids))
+
+    def forget(self, session_id):
+        with self._lock:
+            self._views.pop(session_id, None)
+
+    @staticmethod
+    def _shows(view, task):
+        pages, visible_ids = view
+        if task['id'] in visible_ids:
+            return True
+        if 'priority' not in task or 'due_date' not in task:
+            return False
+        after, last, has_more = pages.get(task['priority'], (None, None, False))
+        key = (task['due_date'], task['id'])
+        if after and key <= tuple(after):
+            return False
+        return not (has_more and last and key > tuple(last))
+
+    def on_change(self, upserted=(), removed=(), reset=False):
+        """TaskCache listener: rerun the sessions whose visible cards changed."""
+        if reset:
+            # Full reloads are the polling safety net; sessions see them on their next run
+            return
+        origin = current_session_id()
+        with self._lock:
+            affected = [
+                session_id for session_id, view in self._views.items()
+                if session_id != origin and (
+                    any(task_id in view[1] for task_id in removed)
+                    or any(self._shows(view, task) for task in upserted)
+                )
+            ]
+        for session_id in affected:
+            if self.rerun(session_id):
+                self.reruns += 1
+            else:
+                self.forget(session_id)
@@ -0,0 +1,320 @@
+"""Process-wide, rate-limit-aware scheduler for OpenAI completions.
+
+Every completion in task_parser goes through LLMScheduler.create_completion
+instead of calling the client directly. Before a request is sent it waits
+for room in two token buckets: one of requests and one of tokens per minute.
+The buckets start at LLM_REQUESTS_PER_MINUTE and LLM_TOKENS_PER_MINUTE. They
+then follow the x-ratelimit-* headers of every response, so they track the
+account's real limits and the usage of other processes sharing the key. A
+429 pauses all requests until the reset it reports, and the request goes
+back into the queue, up to LLM_RATE_LIMIT_RETRIES times. (With the scheduler
+on, clients.py leaves 429s to it instead of retrying them in the transport.)
+An INTERACTIVE request's timeout covers its time in the queue as well as
+the call, since someone is waiting for it. A BULK request waits in the queue
+as long as it takes and its timeout bounds only the call, so a long
+transcript is paced by the limits instead of losing chunks to timeouts.
+
+Requests have a priority class, taken from the caller's context (see
+llm_priority):
+
+    INTERACTIVE  a few task lines someone is waiting for; the default
+    BULK         transcript chunks and long task lists
+
+Waiting requests are admitted in priority order, then first come first
+served. BULK requests also leave LLM_INTERACTIVE_RESERVE of each bucket
+untouched, so an interactive line rarely waits behind a transcript. Identical
+requests already in flight are coalesced: the later caller waits for the
+first one's response instead of sending its own.
+
+Token costs are counted locally with token_count before sending, scaled by
+how far earlier estimates for the same system prompt were off, and settled
+with the usage reported in the response. stats() returns queue
+depth, wait times, coalesced requests and the limits in effect.
+"""
+import contextlib
+import contextvars
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from token_count import count_message_tokens
+from tracing import span
+
+LLM_SCHEDULER = os.environ.get('LLM_SCHEDULER', '1').lower() in ('1', 'true', 'yes')
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', 3500))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', 60000))
+LLM_INTERACTIVE_RESERVE = float(os.environ.get('LLM_INTERACTIVE_RESERVE', 0.1))
+# Task lists longer than this run as BULK
+LLM_INTERACTIVE_MAX_LINES = int(os.environ.get('LLM_INTERACTIVE_MAX_LINES', 10))
+# 429s requeued by the scheduler before the error is raised; the transport does not retry them
+LLM_RATE_LIMIT_RETRIES = int(os.environ.get('LLM_RATE_LIMIT_RETRIES', 3))
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk'}
+
+_priority = contextvars.ContextVar('llm_priority', default=INTERACTIVE)
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+@contextlib.contextmanager
+def llm_priority(priority):
+    """Run the block, and the parser workers it starts, at the given priority class."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def parse_duration(text):
+    """Seconds in a rate-limit reset header such as '1s', '6m0s' or '20ms'; None if unparseable."""
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(text)
+    if not parts:
+        return None
+    return sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
+
+
+class TokenBucket:
+    """Capacity per minute, refilled continuously; the level may go negative to record debt."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def wait_time(self, amount, floor=0.0):
+        """Seconds until amount can be taken leaving at least floor; 0 if it can be taken now."""
+        missing = amount + floor - self.level
+        return max(0.0, missing * 60 / self.capacity)
+
+    def observe(self, limit, remaining):
+        """Adopt the limit and remaining count reported by the server."""
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+class LLMScheduler:
+    """Admits completions in priority order within the learned request and token limits."""
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 interactive_reserve=LLM_INTERACTIVE_RESERVE, client=None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.interactive_reserve = interactive_reserve
+        self._client = client
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._inflight = {}
+        # Observed usage / estimate per system prompt
+        self._usage_ratios = {}
+        self._stats = {
+            name: {'requests': 0, 'waiting': 0, 'max_waiting': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self._coalesced = 0
+        self._rate_limited = 0
+
+    def client(self):
+        if self._client is None:
+            from clients import get_openai
+
+            self._client = get_openai()
+        return self._client
+
+    def create_completion(self, output_tokens=0, timeout=None, **request):
+        """Send a chat completion when the limits allow and return the parsed response.
+
+        output_tokens is the expected completion length, reserved from the
+        token bucket along with the locally counted prompt. For INTERACTIVE
+        requests timeout bounds the queue wait and the call together, and
+        TimeoutError is raised when it runs out while waiting; for BULK
+        requests it bounds only the call.
+        """
+        if not LLM_SCHEDULER:
+            return self._send(request, timeout)
+        priority = _priority.get()
+        deadline = time.monotonic() + timeout if timeout is not None and priority == INTERACTIVE else None
+        key = hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        with self._cond:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                ticket = [priority, next(self._sequence)]
+                future = Future()
+                self._inflight[key] = (future, ticket)
+            else:
+                future, ticket = inflight
+                self._coalesced += 1
+                if priority < ticket[0] and ticket in self._waiting:
+                    # Promote the queued request this caller now also waits for
+                    ticket[0] = priority
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+        if inflight is not None:
+            with span('llm.coalesced'):
+                return future.result(timeout if priority == INTERACTIVE else None)
+
+        try:
+            prompt = request['messages'][0]['content']
+            counted = count_message_tokens(request['messages'], request.get('model')) + output_tokens
+            with self._cond:
+                estimate = int(counted * self._usage_ratios.get(prompt, 1.0))
+            for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+                with span('llm.queue'):
+                    reserved = self._admit(ticket, estimate, deadline)
+                try:
+                    response = self._send(request, max(deadline - time.monotonic(), 0.001) if deadline else timeout)
+                    break
+                except Exception as e:
+                    # observe() has paused the queue; wait in it again unless retries are used up
+                    if getattr(e, 'status_code', None) != 429 or attempt == LLM_RATE_LIMIT_RETRIES:
+                        raise
+                    with self._cond:
+                        # A rejected request uses no tokens
+                        self.tokens.level += reserved
+            usage = getattr(response, 'usage', None)
+            if usage and usage.total_tokens:
+                with self._cond:
+                    # Settle the difference between the estimate and the actual usage
+                    self.tokens.level -= usage.total_tokens - reserved
+                    ratio = usage.total_tokens / counted
+                    self._usage_ratios[prompt] = 0.8 * self._usage_ratios.get(prompt, ratio) + 0.2 * ratio
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                del self._inflight[key]
+
+    def _admit(self, ticket, estimate, deadline=None):
+        """Wait until ticket heads the queue and the buckets have room; returns the tokens taken.
+
+        Raises TimeoutError if the monotonic deadline passes first.
+        """
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            stats = self._stats[PRIORITY_NAMES[ticket[0]]]
+            stats['waiting'] += 1
+            stats['max_waiting'] = max(stats['max_waiting'], stats['waiting'])
+            # Newcomers may outrank whoever is at the head
+            self._cond.notify_all()
+            try:
+                while True:
+                    delay = None
+                    if self._waiting[0] is ticket:
+                        delay = self._delay(ticket[0], estimate)
+                        if delay <= 0:
+                            break
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("Timed out waiting for the OpenAI rate limit")
+                        delay = remaining if delay is None else min(delay, remaining)
+                    self._cond.wait(delay)
+                reserved = min(estimate, self.tokens.capacity)
+                self.requests.level -= 1
+                self.tokens.level -= reserved
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                stats['waiting'] -= 1
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            stats['requests'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+        return reserved
+
+    def _delay(self, priority, estimate):
+        """Seconds the head of the queue must still wait; called with the lock held."""
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        reserve = self.interactive_reserve if priority == BULK else 0.0
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, reserve * self.requests.capacity),
+            # A request larger than the whole bucket is sent once the bucket is full
+            self.tokens.wait_time(min(estimate, self.tokens.capacity * (1 - reserve)),
+                                  reserve * self.tokens.capacity)
+        )
+
+    def _send(self, request, timeout):
+        options = {'timeout': timeout} if timeout is not None else {}
+        try:
+            raw = self.client().chat.completions.with_raw_response.create(**request, **options)
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            if response is not None:
+                self.observe(response.headers, getattr(e, 'status_code', None))
+            raise
+        self.observe(raw.headers, raw.status_code)
+        return raw.parse()
+
+    def observe(self, headers, status_code=None):
+        """Learn the limits, remaining capacity and any pause from response headers."""
+        def number(name):
+            try:
+                return float(headers[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        with self._cond:
+            self.requests.refill(time.monotonic())
+            self.tokens.refill(time.monotonic())
+            self.requests.observe(number('x-ratelimit-limit-requests'), number('x-ratelimit-remaining-requests'))
+            self.tokens.observe(number('x-ratelimit-limit-tokens'), number('x-ratelimit-remaining-tokens'))
+            if status_code == 429:
+                self._rate_limited += 1
+                pause = parse_duration(headers.get('retry-after')) or max(
+                    parse_duration(headers.get('x-ratelimit-reset-requests')) or 0,
+                    parse_duration(headers.get('x-ratelimit-reset-tokens')) or 0
+                ) or 1.0
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Per-class queue depth and wait times, plus coalescing, 429s and the limits in effect."""
+        with self._cond:
+            classes = {name: dict(stats) for name, stats in self._stats.items()}
+            for stats in classes.values():
+                stats['mean_wait_seconds'] = stats['wait_seconds'] / stats['requests'] if stats['requests'] else 0.0
+            return {
+                'classes': classes,
+                'queued': sum(stats['waiting'] for stats in classes.values()),
+                'coalesced': self._coalesced,
+                'rate_limited': self._rate_limited,
+                'requests_per_minute': self.requests.capacity,
+                'tokens_per_minute': self.tokens.capacity
+            }
+
+
+scheduler = LLMScheduler()
+
+
+def get_scheduler_stats():
+    return scheduler.stats()
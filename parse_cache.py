@@ -0,0 +1,106 @@
+"""Persistent cache for raw LLM parse results.
+
+With temperature=0 the structured output for a given input, model and prompt
+is deterministic, so the raw JSON string is stored in a local SQLite file and
+reused across Streamlit reruns and process restarts. Only the raw JSON is
+cached: relative dates like "tomorrow" are still resolved against the
+current time after every hit.
+
+Entries expire after CACHE_TTL_SECONDS and the least recently used entries
+are evicted once the cache holds more than CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get('PARSE_CACHE_PATH', '.parse_cache.sqlite3')
+CACHE_TTL_SECONDS = int(os.environ.get('PARSE_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get('PARSE_CACHE_MAX_ENTRIES', 20000))
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different inputs share a cache entry."""
+    return ' '.join(text.split())
+
+
+def prompt_version(prompt):
+    """Short fingerprint of a system prompt, so prompt edits invalidate old entries."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+
+
+class ParseCache:
+    """SQLite-backed LRU/TTL cache of raw LLM JSON keyed on input, model and prompt."""
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,
+                raw TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache (last_used)')
+
+    @staticmethod
+    def make_key(text, model, version):
+        return hashlib.sha256(f"{model}\0{version}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get(self, text, model, version):
+        """Return the cached raw JSON string, or None on a miss."""
+        key = self.make_key(text, model, version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT raw, created_at FROM parse_cache WHERE key = ?', (key,)).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute('UPDATE parse_cache SET last_used = ? WHERE key = ?', (now, key))
+                self.hits += 1
+                return row[0]
+            if row:
+                self._conn.execute('DELETE FROM parse_cache WHERE key = ?', (key,))
+            self.misses += 1
+            return None
+
+    def put(self, text, model, version, raw):
+        """Store a raw JSON string and evict expired or least recently used entries."""
+        key = self.make_key(text, model, version)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO parse_cache (key, raw, created_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, raw, now, now)
+            )
+            self._conn.execute('DELETE FROM parse_cache WHERE created_at < ?', (now - self.ttl_seconds,))
+            self._conn.execute(
+                'DELETE FROM parse_cache WHERE key IN ('
+                'SELECT key FROM parse_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM parse_cache')
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters for this process and the number of stored entries."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM parse_cache').fetchone()[0]
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+            'entries': entries
+        }
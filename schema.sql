@@ -0,0 +1,158 @@
+-- Schema for the Supabase (Postgres) tasks table.
+-- Run once in the Supabase SQL editor; every statement is safe to re-run.
+
+create table if not exists tasks (
+    id bigint generated by default as identity primary key,
+    title text not null,
+    assignee text not null,
+    due_date timestamp not null,
+    priority text not null default 'P3' check (priority in ('P1', 'P2', 'P3', 'P4'))
+);
+
+-- Server-side dedup for database.add_tasks: the bulk upsert uses
+-- on_conflict=(title, assignee, due_date, priority) and ignores duplicates.
+-- Rows that are already duplicated must go before the constraint can be added.
+delete from tasks a
+    using tasks b
+    where a.id > b.id
+      and a.title = b.title
+      and a.assignee = b.assignee
+      and a.due_date = b.due_date
+      and a.priority = b.priority;
+
+do $$
+begin
+    if not exists (select 1 from pg_constraint where conname = 'tasks_dedup_key') then
+        alter table tasks
+            add constraint tasks_dedup_key unique (title, assignee, due_date, priority);
+    end if;
+end $$;
+
+-- Indexes for database.query_tasks: keyset pagination on (due_date, id),
+-- optionally filtered by priority or assignee.
+create index if not exists tasks_due_date_id_idx on tasks (due_date, id);
+create index if not exists tasks_priority_due_date_id_idx on tasks (priority, due_date, id);
+create index if not exists tasks_assignee_due_date_id_idx on tasks (assignee, due_date, id);
+
+-- Change tracking for the in-process task cache (task_cache.py): incremental
+-- refreshes fetch rows with updated_at at or after the last one seen.
+alter table tasks add column if not exists updated_at timestamptz not null default now();
+
+create or replace function set_tasks_updated_at() returns trigger
+language plpgsql as $$
+begin
+    new.updated_at := now();
+    return new;
+end $$;
+
+drop trigger if exists tasks_set_updated_at on tasks;
+create trigger tasks_set_updated_at
+    before update on tasks
+    for each row execute function set_tasks_updated_at();
+
+-- Reloads and refreshes are paged on (updated_at, id)
+drop index if exists tasks_updated_at_idx;
+create index if not exists tasks_updated_at_id_idx on tasks (updated_at, id);
+
+-- Change feed for live boards (change_feed.py, CHANGE_FEED=postgres): every
+-- insert, update and delete notifies the tasks_changes channel with the
+-- operation and the row, so each app process LISTENs once instead of polling.
+create or replace function notify_tasks_change() returns trigger
+language plpgsql as $$
+begin
+    perform pg_notify('tasks_changes', json_build_object(
+        'op', tg_op,
+        'id', coalesce(new.id, old.id),
+        'row', case when tg_op = 'DELETE' then null else row_to_json(new) end
+    )::text);
+    return null;
+end $$;
+
+drop trigger if exists tasks_notify_change on tasks;
+create trigger tasks_notify_change
+    after insert or update or delete on tasks
+    for each row execute function notify_tasks_change();
+
+-- Assignee dashboard (database.get_assignee_dashboard): task counts per
+-- (assignee, priority, due day), kept current by a trigger on every write so
+-- the dashboard aggregates a few thousand rollup rows instead of the table.
+create table if not exists task_rollups (
+    assignee text not null,
+    priority text not null,
+    due_day date not null,
+    task_count integer not null,
+    primary key (assignee, priority, due_day)
+);
+
+create or replace function apply_task_rollup(p_assignee text, p_priority text, p_due_day date, p_delta integer)
+returns void language plpgsql as $$
+begin
+    insert into task_rollups (assignee, priority, due_day, task_count)
+        values (p_assignee, p_priority, p_due_day, p_delta)
+        on conflict (assignee, priority, due_day)
+        do update set task_count = task_rollups.task_count + excluded.task_count;
+    delete from task_rollups
+        where assignee = p_assignee and priority = p_priority and due_day = p_due_day and task_count = 0;
+end $$;
+
+create or replace function maintain_task_rollups() returns trigger
+language plpgsql as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform apply_task_rollup(old.assignee, old.priority, old.due_date::date, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform apply_task_rollup(new.assignee, new.priority, new.due_date::date, 1);
+    end if;
+    return null;
+end $$;
+
+drop trigger if exists tasks_maintain_rollups on tasks;
+create trigger tasks_maintain_rollups
+    after insert or update of assignee, priority, due_date or delete on tasks
+    for each row execute function maintain_task_rollups();
+
+-- Rebuild from the table, so re-running this file also repairs any drift
+truncate task_rollups;
+insert into task_rollups (assignee, priority, due_day, task_count)
+    select assignee, priority, due_date::date, count(*) from tasks group by 1, 2, 3;
+
+-- One row per assignee: tasks per priority, overdue tasks (due before
+-- p_now) and tasks due on each of the p_days days starting today. Called
+-- through PostgREST as POST /rest/v1/rpc/assignee_dashboard.
+create or replace function assignee_dashboard(p_now timestamp, p_days integer default 14)
+returns table (
+    assignee text, p1 bigint, p2 bigint, p3 bigint, p4 bigint, overdue bigint, due_by_day bigint[]
+)
+language sql stable as $$
+    with totals as (
+        select r.assignee,
+               coalesce(sum(r.task_count) filter (where r.priority = 'P1'), 0) as p1,
+               coalesce(sum(r.task_count) filter (where r.priority = 'P2'), 0) as p2,
+               coalesce(sum(r.task_count) filter (where r.priority = 'P3'), 0) as p3,
+               coalesce(sum(r.task_count) filter (where r.priority = 'P4'), 0) as p4,
+               coalesce(sum(r.task_count) filter (where r.due_day < p_now::date), 0) as overdue_before_today
+        from task_rollups r
+        group by r.assignee
+    ),
+    -- Only today's bucket needs the table itself, for tasks already past due today
+    overdue_today as (
+        select t.assignee, count(*) as overdue
+        from tasks t
+        where t.due_date >= p_now::date and t.due_date < p_now
+        group by t.assignee
+    )
+    select totals.assignee, totals.p1::bigint, totals.p2::bigint, totals.p3::bigint, totals.p4::bigint,
+           (totals.overdue_before_today + coalesce(overdue_today.overdue, 0))::bigint,
+           array(
+               select coalesce(sum(r.task_count), 0)::bigint
+               from generate_series(0, p_days - 1) as day
+               left join task_rollups r
+                   on r.assignee = totals.assignee and r.due_day = p_now::date + day
+               group by day
+               order by day
+           )
+    from totals
+    left join overdue_today on overdue_today.assignee = totals.assignee
+    order by totals.p1 + totals.p2 + totals.p3 + totals.p4 desc, totals.assignee;
+$$;
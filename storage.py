@@ -0,0 +1,489 @@
+"""Storage backends for the tasks table.
+
+database.py talks to the backend chosen by the STORAGE_BACKEND setting:
+
+    supabase  the hosted Postgres table through PostgREST (default, see schema.sql)
+    sqlite    an embedded SQLite file at STORAGE_SQLITE_PATH, for edge boxes,
+              CI and local development without network access
+
+Backends exchange task dicts ({'id', 'task_name', 'assignee', 'due_date',
+'priority', 'updated_at'}) and know nothing about Streamlit; error reporting,
+tracing and the task cache stay in database.py.
+"""
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+PRIORITIES = ['P1', 'P2', 'P3', 'P4']
+
+# Task dict keys mapped to table columns
+TASK_COLUMNS = {
+    'id': 'id',
+    'task_name': 'title',
+    'assignee': 'assignee',
+    'due_date': 'due_date',
+    'priority': 'priority',
+    'updated_at': 'updated_at'
+}
+
+# Columns covered by the unique constraint used for server-side dedup (see schema.sql)
+DEDUP_COLUMNS = 'title,assignee,due_date,priority'
+# Rows per request when the task cache loads the table; at most PostgREST's max-rows (1000 on Supabase)
+RELOAD_PAGE_SIZE = 1000
+
+
+def dedup_key(title, assignee, due_date, priority):
+    return (title, assignee, due_date.replace(tzinfo=None), priority)
+
+
+def row_to_task(row):
+    """Convert a tasks table row (possibly a projection) into a task dict."""
+    task = {}
+    for key, column in TASK_COLUMNS.items():
+        if column in row:
+            task[key] = row[column]
+    for key in ('due_date', 'updated_at'):
+        if task.get(key):
+            task[key] = datetime.fromisoformat(task[key])
+    return task
+
+
+def dashboard_row(assignee, open_counts, overdue, due_by_day):
+    """One assignee's dashboard entry; every stored task counts as open."""
+    open_counts = {priority: int(open_counts.get(priority) or 0) for priority in PRIORITIES}
+    return {
+        'assignee': assignee,
+        'open': open_counts,
+        'open_total': sum(open_counts.values()),
+        'overdue': int(overdue or 0),
+        'due_by_day': [int(count) for count in due_by_day]
+    }
+
+
+def _projection(columns):
+    """Task keys to fetch; 'id' and 'due_date' are always included for the cursor."""
+    return ['id', 'due_date'] + [key for key in (columns or TASK_COLUMNS) if key not in ('id', 'due_date')]
+
+
+def _after_keyset(query, column, value, after_id):
+    """Keep rows after (value, after_id) in (column, id) order.
+
+    This is the filter or_() builds in newer postgrest-py releases; 0.13 has
+    no or_(), so the param is added directly.
+    """
+    query.params = query.params.add('or', f"({column}.gt.{value},and({column}.eq.{value},id.gt.{after_id}))")
+    return query
+
+
+def _order_by(query, *columns):
+    """Order by several columns in one order param.
+
+    Each .order() call adds its own order param, and PostgREST applies only
+    one of them, which would drop the id tiebreak the keyset cursors rely on.
+    """
+    query.params = query.params.add('order', ','.join(columns))
+    return query
+
+
+class StorageBackend:
+    """Interface implemented by every storage backend."""
+
+    def init(self):
+        """Check the backend is reachable and its schema exists."""
+        raise NotImplementedError
+
+    def add_tasks(self, tasks):
+        """Insert tasks that are unique among themselves, skipping ones already stored.
+
+        Returns (inserted, duplicates): inserted tasks are read back with
+        their new 'id', duplicates are the input tasks that already existed.
+        """
+        raise NotImplementedError
+
+    def get_all_tasks(self):
+        """Return every task ordered by due date."""
+        raise NotImplementedError
+
+    def query_tasks(self, priority=None, assignee=None, due_after=None, due_before=None,
+                    after=None, limit=50, columns=None):
+        """Return one (due_date, id) keyset page as (tasks, next_cursor); see database.query_tasks."""
+        raise NotImplementedError
+
+    def count_tasks_by_priority(self, assignee=None, due_after=None, due_before=None):
+        """Return {priority: count} for the matching tasks."""
+        raise NotImplementedError
+
+    def get_tasks_updated_since(self, since=None):
+        """Return tasks with updated_at at or after since (all tasks when None), oldest first."""
+        raise NotImplementedError
+
+    def assignee_dashboard(self, now, days):
+        """Return one dashboard_row per assignee, busiest first.
+
+        Counts come from the task_rollups table kept current by triggers;
+        overdue means due before now, and due_by_day counts the tasks due on
+        each of the `days` days starting with now's date.
+        """
+        raise NotImplementedError
+
+    def update_task(self, task_id, task_name, assignee, due_date, priority):
+        raise NotImplementedError
+
+    def delete_task(self, task_id):
+        raise NotImplementedError
+
+
+class SupabaseBackend(StorageBackend):
+    """Hosted Postgres through PostgREST; filters and pagination run on the server."""
+
+    def _table(self):
+        from clients import get_supabase
+        return get_supabase().table('tasks')
+
+    @staticmethod
+    def _apply_filters(query, priority=None, assignee=None, due_after=None, due_before=None):
+        """Push task filters down into a PostgREST query."""
+        if priority:
+            query = query.eq('priority', priority)
+        if assignee:
+            query = query.eq('assignee', assignee)
+        if due_after:
+            query = query.gte('due_date', due_after.isoformat())
+        if due_before:
+            query = query.lt('due_date', due_before.isoformat())
+        return query
+
+    def init(self):
+        self._table().select('*').limit(1).execute()
+
+    def add_tasks(self, tasks):
+        response = self._table().upsert(
+            [{
+                'title': task['task_name'],
+                'assignee': task['assignee'],
+                'due_date': task['due_date'].isoformat(),
+                'priority': task['priority']
+            } for task in tasks],
+            on_conflict=DEDUP_COLUMNS,
+            ignore_duplicates=True
+        ).execute()
+
+        # Only newly inserted rows come back; everything else was a duplicate
+        returned = {}
+        for row in response.data:
+            task = row_to_task(row)
+            returned[dedup_key(task['task_name'], task['assignee'], task['due_date'], task['priority'])] = task
+        inserted, duplicates = [], []
+        for task in tasks:
+            key = dedup_key(task['task_name'], task['assignee'], task['due_date'], task['priority'])
+            if key in returned:
+                inserted.append(returned[key])
+            else:
+                duplicates.append(task)
+        return inserted, duplicates
+
+    def get_all_tasks(self):
+        response = self._table().select('*').order('due_date').execute()
+        return [row_to_task(row) for row in response.data]
+
+    def query_tasks(self, priority=None, assignee=None, due_after=None, due_before=None,
+                    after=None, limit=50, columns=None):
+        query = self._table().select(','.join(TASK_COLUMNS[key] for key in _projection(columns)))
+        query = self._apply_filters(query, priority, assignee, due_after, due_before)
+        if after:
+            query = _after_keyset(query, 'due_date', after[0].isoformat(), after[1])
+        response = _order_by(query, 'due_date', 'id').limit(limit).execute()
+
+        tasks = [row_to_task(row) for row in response.data]
+        next_cursor = None
+        if len(tasks) == limit:
+            next_cursor = (tasks[-1]['due_date'], tasks[-1]['id'])
+        return tasks, next_cursor
+
+    def count_tasks_by_priority(self, assignee=None, due_after=None, due_before=None):
+        counts = {}
+        for priority in PRIORITIES:
+            query = self._table().select('id', count='exact')
+            query = self._apply_filters(query, priority, assignee, due_after, due_before)
+            counts[priority] = query.limit(1).execute().count or 0
+        return counts
+
+    def get_tasks_updated_since(self, since=None):
+        # Paged on (updated_at, id): one unpaginated select is silently cut off at PostgREST's max-rows
+        tasks, after = [], None
+        while True:
+            query = self._table().select('*')
+            if since:
+                query = query.gte('updated_at', since.isoformat())
+            if after:
+                query = _after_keyset(query, 'updated_at', *after)
+            rows = _order_by(query, 'updated_at', 'id').limit(RELOAD_PAGE_SIZE).execute().data
+            # Stop on an empty page rather than a short one, in case the server caps pages below our limit
+            if not rows:
+                return tasks
+            tasks.extend(row_to_task(row) for row in rows)
+            after = (rows[-1]['updated_at'], rows[-1]['id'])
+
+    def assignee_dashboard(self, now, days):
+        from clients import get_supabase
+        response = get_supabase().rpc('assignee_dashboard', {
+            'p_now': now.replace(tzinfo=None).isoformat(), 'p_days': days
+        }).execute()
+        return [
+            dashboard_row(
+                row['assignee'],
+                {priority: row[priority.lower()] for priority in PRIORITIES},
+                row['overdue'],
+                row['due_by_day']
+            )
+            for row in response.data
+        ]
+
+    def update_task(self, task_id, task_name, assignee, due_date, priority):
+        self._table().update({
+            'title': task_name,
+            'assignee': assignee,
+            'due_date': due_date.isoformat(),
+            'priority': priority
+        }).eq('id', task_id).execute()
+
+    def delete_task(self, task_id):
+        self._table().delete().eq('id', task_id).execute()
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite file in WAL mode with the same indexes as schema.sql.
+
+    Every statement is a constant SQL string with bound parameters, so the
+    sqlite3 module compiles each one once and reuses it from its statement
+    cache. due_date is stored as a naive ISO string and updated_at as a UTC
+    ISO string with microseconds, both of which sort correctly as text.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            assignee TEXT NOT NULL,
+            due_date TEXT NOT NULL,
+            priority TEXT NOT NULL DEFAULT 'P3' CHECK (priority IN ('P1', 'P2', 'P3', 'P4')),
+            updated_at TEXT NOT NULL,
+            UNIQUE (title, assignee, due_date, priority)
+        );
+        CREATE INDEX IF NOT EXISTS tasks_due_date_id_idx ON tasks (due_date, id);
+        CREATE INDEX IF NOT EXISTS tasks_priority_due_date_id_idx ON tasks (priority, due_date, id);
+        CREATE INDEX IF NOT EXISTS tasks_assignee_due_date_id_idx ON tasks (assignee, due_date, id);
+        CREATE INDEX IF NOT EXISTS tasks_updated_at_idx ON tasks (updated_at);
+
+        CREATE TABLE IF NOT EXISTS task_rollups (
+            assignee TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            due_day TEXT NOT NULL,
+            task_count INTEGER NOT NULL,
+            PRIMARY KEY (assignee, priority, due_day)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS task_rollups_due_day_idx ON task_rollups (due_day, assignee, task_count);
+        CREATE TRIGGER IF NOT EXISTS tasks_rollup_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_rollups VALUES (new.assignee, new.priority, substr(new.due_date, 1, 10), 1)
+                ON CONFLICT (assignee, priority, due_day) DO UPDATE SET task_count = task_count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_rollup_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_rollups SET task_count = task_count - 1
+                WHERE assignee = old.assignee AND priority = old.priority AND due_day = substr(old.due_date, 1, 10);
+            DELETE FROM task_rollups WHERE task_count = 0
+                AND assignee = old.assignee AND priority = old.priority AND due_day = substr(old.due_date, 1, 10);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_rollup_update AFTER UPDATE OF assignee, priority, due_date ON tasks BEGIN
+            UPDATE task_rollups SET task_count = task_count - 1
+                WHERE assignee = old.assignee AND priority = old.priority AND due_day = substr(old.due_date, 1, 10);
+            DELETE FROM task_rollups WHERE task_count = 0
+                AND assignee = old.assignee AND priority = old.priority AND due_day = substr(old.due_date, 1, 10);
+            INSERT INTO task_rollups VALUES (new.assignee, new.priority, substr(new.due_date, 1, 10), 1)
+                ON CONFLICT (assignee, priority, due_day) DO UPDATE SET task_count = task_count + 1;
+        END;
+    """
+    # Fills task_rollups for a database file created before the rollups existed
+    BACKFILL_ROLLUPS_SQL = """
+        INSERT INTO task_rollups (assignee, priority, due_day, task_count)
+            SELECT assignee, priority, substr(due_date, 1, 10), COUNT(*) FROM tasks WHERE true GROUP BY 1, 2, 3
+    """
+
+    INSERT_SQL = ('INSERT OR IGNORE INTO tasks (title, assignee, due_date, priority, updated_at) '
+                  'VALUES (?, ?, ?, ?, ?)')
+    SELECT_SQL = 'SELECT id, title, assignee, due_date, priority, updated_at FROM tasks'
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        if self._conn.execute('SELECT NOT EXISTS (SELECT 1 FROM task_rollups) AND EXISTS (SELECT 1 FROM tasks)').fetchone()[0]:
+            self._conn.execute(self.BACKFILL_ROLLUPS_SQL)
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+    @staticmethod
+    def _due(due_date):
+        return due_date.replace(tzinfo=None).isoformat(timespec='seconds')
+
+    @staticmethod
+    def _where(priority=None, assignee=None, due_after=None, due_before=None):
+        clauses, params = [], []
+        if priority:
+            clauses.append('priority = ?')
+            params.append(priority)
+        if assignee:
+            clauses.append('assignee = ?')
+            params.append(assignee)
+        if due_after:
+            clauses.append('due_date >= ?')
+            params.append(SQLiteBackend._due(due_after))
+        if due_before:
+            clauses.append('due_date < ?')
+            params.append(SQLiteBackend._due(due_before))
+        return clauses, params
+
+    def _select(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [row_to_task(dict(row)) for row in rows]
+
+    def init(self):
+        self._select(f"{self.SELECT_SQL} LIMIT 1")
+
+    def add_tasks(self, tasks):
+        inserted, duplicates = [], []
+        now = self._now()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for task in tasks:
+                    cursor = self._conn.execute(self.INSERT_SQL, (
+                        task['task_name'], task['assignee'], self._due(task['due_date']), task['priority'], now
+                    ))
+                    if cursor.rowcount:
+                        inserted.append({
+                            **task,
+                            'id': cursor.lastrowid,
+                            'due_date': task['due_date'].replace(tzinfo=None),
+                            'updated_at': datetime.fromisoformat(now)
+                        })
+                    else:
+                        duplicates.append(task)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return inserted, duplicates
+
+    def get_all_tasks(self):
+        return self._select(f"{self.SELECT_SQL} ORDER BY due_date, id")
+
+    def query_tasks(self, priority=None, assignee=None, due_after=None, due_before=None,
+                    after=None, limit=50, columns=None):
+        clauses, params = self._where(priority, assignee, due_after, due_before)
+        if after:
+            after_due, after_id = after
+            # A row-value comparison lets SQLite seek the (due_date, id) index; the OR form scans it
+            clauses.append('(due_date, id) > (?, ?)')
+            params += [self._due(after_due), after_id]
+        select = ', '.join(TASK_COLUMNS[key] for key in _projection(columns))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        tasks = self._select(f"SELECT {select} FROM tasks{where} ORDER BY due_date, id LIMIT ?", (*params, limit))
+        next_cursor = None
+        if len(tasks) == limit:
+            next_cursor = (tasks[-1]['due_date'], tasks[-1]['id'])
+        return tasks, next_cursor
+
+    def count_tasks_by_priority(self, assignee=None, due_after=None, due_before=None):
+        clauses, params = self._where(None, assignee, due_after, due_before)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(f"SELECT priority, COUNT(*) FROM tasks{where} GROUP BY priority", params).fetchall()
+        counts = dict.fromkeys(PRIORITIES, 0)
+        counts.update({priority: count for priority, count in rows})
+        return counts
+
+    def get_tasks_updated_since(self, since=None):
+        if since is None:
+            return self._select(f"{self.SELECT_SQL} ORDER BY updated_at")
+        since = since.astimezone(timezone.utc).isoformat(timespec='microseconds')
+        return self._select(f"{self.SELECT_SQL} WHERE updated_at >= ? ORDER BY updated_at", (since,))
+
+    def assignee_dashboard(self, now, days):
+        today = now.date()
+        start, end = today.isoformat(), (today + timedelta(days=days)).isoformat()
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT assignee, "
+                "SUM(CASE WHEN priority = 'P1' THEN task_count ELSE 0 END), "
+                "SUM(CASE WHEN priority = 'P2' THEN task_count ELSE 0 END), "
+                "SUM(CASE WHEN priority = 'P3' THEN task_count ELSE 0 END), "
+                "SUM(CASE WHEN priority = 'P4' THEN task_count ELSE 0 END), "
+                "SUM(CASE WHEN due_day < ? THEN task_count ELSE 0 END) "
+                "FROM task_rollups GROUP BY assignee", (start,)
+            ).fetchall()
+            # Only today's bucket needs the table itself, for tasks already past due today
+            overdue_today = dict(self._conn.execute(
+                'SELECT assignee, COUNT(*) FROM tasks WHERE due_date >= ? AND due_date < ? GROUP BY assignee',
+                (start, self._due(now))
+            ).fetchall())
+            upcoming = self._conn.execute(
+                'SELECT assignee, due_day, SUM(task_count) FROM task_rollups '
+                'WHERE due_day >= ? AND due_day < ? GROUP BY assignee, due_day', (start, end)
+            ).fetchall()
+        due_by_day = {}
+        for assignee, due_day, count in upcoming:
+            offset = (date.fromisoformat(due_day) - today).days
+            due_by_day.setdefault(assignee, [0] * days)[offset] = count
+        rows = [
+            dashboard_row(
+                assignee,
+                dict(zip(PRIORITIES, counts[:4])),
+                counts[4] + overdue_today.get(assignee, 0),
+                due_by_day.get(assignee, [0] * days)
+            )
+            for assignee, *counts in totals
+        ]
+        rows.sort(key=lambda row: (-row['open_total'], row['assignee']))
+        return rows
+
+    def update_task(self, task_id, task_name, assignee, due_date, priority):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE tasks SET title = ?, assignee = ?, due_date = ?, priority = ?, updated_at = ? WHERE id = ?',
+                (task_name, assignee, self._due(due_date), priority, self._now(), task_id)
+            )
+
+    def delete_task(self, task_id):
+        with self._lock:
+            self._conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name, sqlite_path='tasks.sqlite3'):
+    if name == 'supabase':
+        return SupabaseBackend()
+    if name == 'sqlite':
+        return SQLiteBackend(sqlite_path)
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+def get_backend():
+    """Return the process-wide backend selected by STORAGE_BACKEND, built on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            from clients import get_setting
+            _backend = create_backend(
+                get_setting('STORAGE_BACKEND', 'supabase'),
+                get_setting('STORAGE_SQLITE_PATH', 'tasks.sqlite3')
+            )
+        return _backend
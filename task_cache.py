@@ -0,0 +1,213 @@
+"""In-process cache of the tasks table for the Task Board read path.
+
+Every Streamlit rerun used to refetch the board from Supabase. TaskCache keeps
+the task set in memory for the whole process and, once it is older than
+TASK_CACHE_MAX_STALENESS seconds, refreshes incrementally: only rows whose
+updated_at is at or after the high-water mark are fetched. The mark is moved
+back by REFRESH_OVERLAP_SECONDS so rows committed slightly out of order are
+not missed; re-fetched rows simply replace their cached copy.
+
+Writes made through database.py are applied to the cache directly
+(write-through), so a user sees their own changes without a refresh.
+Incremental refreshes cannot see rows deleted by other processes, so the
+whole table is reloaded every TASK_CACHE_FULL_RELOAD_SECONDS.
+
+With a change feed (change_feed.py) the cache is live: pushed inserts,
+updates and deletes are applied with apply_change() and snapshot() stops
+polling. The periodic full reload stays as a safety net, because
+notifications are not durable.
+
+Derived indexes can follow every change with subscribe(). A listener that
+raises is logged and skipped, so it cannot fail the write that triggered it.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+TASK_CACHE_MAX_STALENESS = float(os.environ.get('TASK_CACHE_MAX_STALENESS', 30))
+TASK_CACHE_FULL_RELOAD_SECONDS = float(os.environ.get('TASK_CACHE_FULL_RELOAD_SECONDS', 600))
+REFRESH_OVERLAP_SECONDS = 5
+
+_logger = logging.getLogger(__name__)
+
+
+def _sort_key(task):
+    return (task['due_date'], task['id'])
+
+
+def filter_tasks(tasks, priority=None, assignee=None, due_after=None, due_before=None):
+    """Filter tasks in memory with the same semantics as database.query_tasks."""
+    return [
+        task for task in tasks
+        if (not priority or task['priority'] == priority)
+        and (not assignee or task['assignee'] == assignee)
+        and (not due_after or task['due_date'] >= due_after)
+        and (not due_before or task['due_date'] < due_before)
+    ]
+
+
+def page_tasks(tasks, after=None, limit=50):
+    """Return one (due_date, id) keyset page of tasks sorted by that key.
+
+    Returns (tasks, next_cursor) like database.query_tasks.
+    """
+    if after:
+        tasks = [task for task in tasks if _sort_key(task) > tuple(after)]
+    page = tasks[:limit]
+    next_cursor = _sort_key(page[-1]) if len(tasks) > limit else None
+    return page, next_cursor
+
+
+class TaskCache:
+    """Process-wide task set with incremental refresh and write-through updates."""
+
+    def __init__(self, fetch_changed, max_staleness=TASK_CACHE_MAX_STALENESS,
+                 full_reload_seconds=TASK_CACHE_FULL_RELOAD_SECONDS):
+        """fetch_changed(since) returns tasks with updated_at >= since, or all tasks when since is None."""
+        self.fetch_changed = fetch_changed
+        self.max_staleness = max_staleness
+        self.full_reload_seconds = full_reload_seconds
+        # Board renders served from memory versus ones that had to fetch first
+        self.cached_reruns = 0
+        self.network_reruns = 0
+        self.network_reads = 0
+        self.pushed_changes = 0
+        self.live = False
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._sorted = None
+        self._high_water = None
+        self._refreshed_at = None
+        self._reloaded_at = None
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """Call listener(upserted=..., removed=..., reset=...) on every change to the task set."""
+        self._listeners.append(listener)
+
+    def _notify(self, **change):
+        for listener in self._listeners:
+            try:
+                listener(**change)
+            except Exception:
+                # The change is already stored; a failing listener must not undo the caller's write
+                _logger.exception("Task cache listener %r failed", listener)
+
+    def snapshot(self):
+        """Return all cached tasks sorted by (due_date, id), refreshing first if stale."""
+        with self._lock:
+            return self._snapshot()
+
+    def board_snapshot(self):
+        """snapshot() for one board render, counted as a rerun served from memory or the network."""
+        with self._lock:
+            network_reads = self.network_reads
+            tasks = self._snapshot()
+            if self.network_reads == network_reads:
+                self.cached_reruns += 1
+            else:
+                self.network_reruns += 1
+            return tasks
+
+    def _snapshot(self):
+        now = time.monotonic()
+        if self._reloaded_at is None or now - self._reloaded_at >= self.full_reload_seconds:
+            self._reload(now)
+        elif not self.live and now - self._refreshed_at >= self.max_staleness:
+            self._refresh(now)
+        if self._sorted is None:
+            self._sorted = sorted(self._tasks.values(), key=_sort_key)
+        return self._sorted
+
+    def _reload(self, now):
+        tasks = self.fetch_changed(None)
+        self._tasks = {}
+        self._high_water = None
+        self._merge(tasks, reset=True)
+        self._reloaded_at = self._refreshed_at = now
+        self.network_reads += 1
+
+    def _refresh(self, now):
+        since = self._high_water - timedelta(seconds=REFRESH_OVERLAP_SECONDS) if self._high_water else None
+        self._merge(self.fetch_changed(since))
+        self._refreshed_at = now
+        self.network_reads += 1
+
+    def _merge(self, tasks, reset=False):
+        for task in tasks:
+            self._tasks[task['id']] = task
+            updated_at = task.get('updated_at')
+            if updated_at and (self._high_water is None or updated_at > self._high_water):
+                self._high_water = updated_at
+        if tasks:
+            self._sorted = None
+        if tasks or reset:
+            self._notify(upserted=tasks, removed=(), reset=reset)
+
+    def put(self, tasks):
+        """Write-through for inserted or updated tasks (each must carry its 'id')."""
+        with self._lock:
+            if self._reloaded_at is None:
+                # Nothing loaded yet (e.g. a bulk import); the first read fetches everything
+                return
+            merged = []
+            for task in tasks:
+                merged.append({**self._tasks.get(task['id'], {}), **task})
+                self._tasks[task['id']] = merged[-1]
+            self._sorted = None
+            self._notify(upserted=merged, removed=(), reset=False)
+
+    def remove(self, task_id):
+        """Write-through for a deleted task."""
+        with self._lock:
+            if self._tasks.pop(task_id, None) is not None:
+                self._sorted = None
+            self._notify(upserted=(), removed=(task_id,), reset=False)
+
+    def apply_change(self, op, task):
+        """Apply one pushed change; op is 'INSERT', 'UPDATE' or 'DELETE' and task carries its 'id'."""
+        with self._lock:
+            self.pushed_changes += 1
+            if self._reloaded_at is None:
+                # Nothing loaded yet; the first read fetches everything
+                return
+            if op == 'DELETE':
+                if self._tasks.pop(task['id'], None) is not None:
+                    self._sorted = None
+                    self._notify(upserted=(), removed=(task['id'],), reset=False)
+                return
+            cached = self._tasks.get(task['id'], {})
+            # Ignore events older than the copy a reload already fetched
+            if cached.get('updated_at') and task.get('updated_at') and task['updated_at'] < cached['updated_at']:
+                return
+            self._merge([{**cached, **task}])
+
+    def set_live(self, live):
+        """Switch between pushed updates and polling; either way the next read reloads to catch up."""
+        with self._lock:
+            self.live = live
+            self._reloaded_at = None
+
+    def invalidate(self):
+        """Force a full reload on the next read."""
+        with self._lock:
+            self._reloaded_at = None
+
+    def stats(self):
+        """Return how many board reruns were served from memory, and how many fetches were made."""
+        with self._lock:
+            cached, network = self.cached_reruns, self.network_reruns
+            network_reads = self.network_reads
+        total = cached + network
+        return {
+            'cached_reruns': cached,
+            'network_reruns': network,
+            'network_reads': network_reads,
+            'cached_ratio': cached / total if total else 0.0,
+            'tasks': len(self._tasks),
+            'max_staleness': self.max_staleness,
+            'live': self.live,
+            'pushed_changes': self.pushed_changes
+        }
@@ -1,246 +1,506 @@
-from datetime import datetime, timedelta
-from dateutil import parser
-import re
-from openai import OpenAI
 import streamlit as st
+import contextvars
 import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from date_resolver import resolve_due_date
+from fast_parser import try_fast_parse
+from parse_cache import ParseCache, prompt_version
+from llm_scheduler import scheduler
+from token_count import count_message_tokens, count_tokens
+from tracing import span, traced
 
-# Initialize OpenAI client
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+MODEL = "gpt-3.5-turbo-0125"
 
-def parse_task(text):
-    """Parse a natural language task into structured data using OpenAI."""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
+TASK_PROMPT = """Parse the task and return a JSON response with these components:
+{
+    "task_name": "the main task description",
+    "assignee": "the person assigned to the task",
+    "due_date": "the due date and time",
+    "priority": "P1, P2, P3, or P4 (default to P3 if not specified)"
+}
+
+Example inputs and expected extractions:
+1. "Finish landing page Aman by 11pm 20th June"
+   - task_name: "Finish landing page"
+   - assignee: "Aman"
+   - due_date: "11pm 20th June"
+
+2. "Call client Rajeev tomorrow 5pm"
+   - task_name: "Call client"
+   - assignee: "Rajeev"
+   - due_date: "tomorrow 5pm"
+
+Rules:
+- Extract task name without the assignee and time information
+- Keep date/time in original format
+- Default to P3 if priority not specified
+- Look for assignee near words like 'to', 'by', 'for', or at the end of task name"""
+
+TRANSCRIPT_PROMPT = """Parse the transcript and return a JSON array of tasks. Each task should have these components:
+{
+    "task_name": "the main task description",
+    "assignee": "the person assigned to the task",
+    "due_date": "the due date and time",
+    "priority": "P1, P2, P3, or P4 (default to P3 if not specified)"
+}
+
+Example input:
+"Aman you take the landing page by 10pm tomorrow. Rajeev you take care of client follow-up by Wednesday."
+
+Rules:
+- Split the transcript into individual tasks
+- Extract task name without the assignee and time information
+- Keep date/time in original format
+- Default to P3 if priority not specified
+- Look for assignee near words like 'you', 'to', 'by', 'for', or at the end of task name
+- Handle priority indicators like 'p1', 'p2' in the text
+- Return an array of task objects"""
+
+PACKED_TASK_PROMPT = """Each input line is a task, prefixed with its line number and a colon. Parse every line and return a JSON object {"tasks": [...]} with one entry per line:
+{
+    "index": the line number,
+    "task_name": "the main task description",
+    "assignee": "the person assigned to the task",
+    "due_date": "the due date and time",
+    "priority": "P1, P2, P3, or P4 (default to P3 if not specified)"
+}
+
+Example input:
+0: Finish landing page Aman by 11pm 20th June
+1: Call client Rajeev tomorrow 5pm p1
+
+Rules:
+- Return exactly one entry for every line number
+- Extract task name without the assignee and time information
+- Keep date/time in original format
+- Default to P3 if priority not specified
+- Look for assignee near words like 'to', 'by', 'for', or at the end of task name"""
+
+# Raw LLM JSON is cached on disk; dates are still resolved fresh on every hit.
+# The file is opened on first use, so importing this module stays cheap.
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+def get_parse_cache():
+    """Return the process-wide ParseCache, opening it on first use."""
+    global _parse_cache
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache()
+        return _parse_cache
+
+# Defaults for concurrent batch parsing
+BATCH_MAX_WORKERS = 8
+BATCH_REQUEST_TIMEOUT = 30
+
+# Long transcripts are parsed as overlapping chunks of whole sentences
+TRANSCRIPT_CHUNK_CHARS = 2000
+TRANSCRIPT_CHUNK_OVERLAP = 1
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r'\w+')
+
+# Packed parsing sends many task lines in one completion, so the prompt is
+# paid once per batch instead of once per line. Batches are sized so the
+# prompt plus the expected output stays within PACK_TOKEN_BUDGET tokens.
+PACKED_PARSING = os.environ.get('PACKED_PARSING', '1').lower() in ('1', 'true', 'yes')
+PACK_TOKEN_BUDGET = int(os.environ.get('PACK_TOKEN_BUDGET', 3000))
+PACK_OUTPUT_TOKENS_PER_LINE = 45
+_TASK_FIELDS = ('task_name', 'assignee', 'due_date', 'priority')
+
+_packing_lock = threading.Lock()
+_packing_stats = {
+    'requests': 0, 'tasks': 0, 'retries': 0, 'prompt_tokens': 0,
+    'completion_tokens': 0, 'unpacked_prompt_tokens': 0, 'seconds': 0.0
+}
+
+def _complete(prompt, text, timeout=None):
+    """Return the raw JSON completion for text, served from the parse cache when possible."""
+    version = prompt_version(prompt)
+    with span('parse_cache.get'):
+        raw = get_parse_cache().get(text, MODEL, version)
+    if raw is not None:
+        return raw
+
+    # A transcript's tasks restate most of it, so expect about as many tokens back
+    output_tokens = PACK_OUTPUT_TOKENS_PER_LINE if prompt == TASK_PROMPT else count_tokens(text, MODEL)
+    with span('llm.openai'):
+        response = scheduler.create_completion(
+            output_tokens=output_tokens,
+            timeout=timeout,
+            model=MODEL,
             messages=[
-                {"role": "system", "content": """Parse the task and return a JSON response with these components:
-                {
-                    "task_name": "the main task description",
-                    "assignee": "the person assigned to the task",
-                    "due_date": "the due date and time",
-                    "priority": "P1, P2, P3, or P4 (default to P3 if not specified)"
-                }
-
-                Example inputs and expected extractions:
-                1. "Finish landing page Aman by 11pm 20th June"
-                   - task_name: "Finish landing page"
-                   - assignee: "Aman"
-                   - due_date: "11pm 20th June"
-                
-                2. "Call client Rajeev tomorrow 5pm"
-                   - task_name: "Call client"
-                   - assignee: "Rajeev"
-                   - due_date: "tomorrow 5pm"
-
-                Rules:
-                - Extract task name without the assignee and time information
-                - Keep date/time in original format
-                - Default to P3 if priority not specified
-                - Look for assignee near words like 'to', 'by', 'for', or at the end of task name"""},
+                {"role": "system", "content": prompt},
                 {"role": "user", "content": text}
             ],
             temperature=0,
             response_format={"type": "json_object"}
         )
-        
-        parsed_data = json.loads(response.choices[0].message.content)
-        
-        # Convert the date string to datetime object
-        if parsed_data.get('due_date'):
-            try:
-                date_text = parsed_data['due_date'].lower()
-                current_time = datetime.now()
-                
-                if 'tomorrow' in date_text:
-                    base_date = current_time + timedelta(days=1)
-                elif 'next week' in date_text:
-                    base_date = current_time + timedelta(weeks=1)
-                else:
-                    base_date = parser.parse(date_text, fuzzy=True)
-                
-                # Extract time if specified (e.g., "3pm", "15:00")
-                time_pattern = r'(\d{1,2})(?::(\d{1,2}))?\s*(am|pm|AM|PM)?'
-                time_match = re.search(time_pattern, date_text)
-                
-                if time_match:
-                    hour = int(time_match.group(1))
-                    minute = int(time_match.group(2)) if time_match.group(2) else 0
-                    period = time_match.group(3)
-                    
-                    if period and period.lower() == 'pm' and hour != 12:
-                        hour += 12
-                    elif period and period.lower() == 'am' and hour == 12:
-                        hour = 0
-                    
-                    parsed_data['due_date'] = base_date.replace(
-                        hour=hour,
-                        minute=minute,
-                        second=0,
-                        microsecond=0
-                    )
-                else:
-                    # Default to 9 AM if no time specified
-                    parsed_data['due_date'] = base_date.replace(
-                        hour=9,
-                        minute=0,
-                        second=0,
-                        microsecond=0
-                    )
-            except Exception as e:
-                st.error(f"Could not parse date: {parsed_data['due_date']} - {str(e)}")
-                return None
-        
-        # Ensure priority is valid
-        if 'priority' in parsed_data:
-            priority = parsed_data['priority'].upper()
-            if priority not in ['P1', 'P2', 'P3', 'P4']:
-                priority = 'P3'
-            parsed_data['priority'] = priority
-        else:
-            parsed_data['priority'] = 'P3'
-            
-        # Clean up and validate
-        task_name = parsed_data.get('task_name', '').strip()
-        assignee = parsed_data.get('assignee', '').strip()
-        
-        if not task_name or not assignee or not parsed_data.get('due_date'):
-            return None
-            
-        return {
-            'task_name': task_name,
-            'assignee': assignee,
-            'due_date': parsed_data['due_date'],
-            'priority': parsed_data['priority']
-        }
+    raw = response.choices[0].message.content
+    # Only cache responses that are valid JSON
+    with span('json.loads'):
+        json.loads(raw)
+    with span('parse_cache.put'):
+        get_parse_cache().put(text, MODEL, version, raw)
+    return raw
+
+def parse_task(text, known_assignees=()):
+    """Parse a natural language task into structured data using OpenAI."""
+    try:
+        return _parse_task(text, known_assignees=known_assignees)
     except Exception as e:
         st.error(f"Error parsing task: {str(e)}")
         return None
 
-def parse_transcript(text):
-    """Parse a transcript containing multiple tasks into a list of structured tasks."""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
-            messages=[
-                {"role": "system", "content": """Parse the transcript and return a JSON array of tasks. Each task should have these components:
-                {
-                    "task_name": "the main task description",
-                    "assignee": "the person assigned to the task",
-                    "due_date": "the due date and time",
-                    "priority": "P1, P2, P3, or P4 (default to P3 if not specified)"
-                }
-
-                Example input:
-                "Aman you take the landing page by 10pm tomorrow. Rajeev you take care of client follow-up by Wednesday."
-
-                Rules:
-                - Split the transcript into individual tasks
-                - Extract task name without the assignee and time information
-                - Keep date/time in original format
-                - Default to P3 if priority not specified
-                - Look for assignee near words like 'you', 'to', 'by', 'for', or at the end of task name
-                - Handle priority indicators like 'p1', 'p2' in the text
-                - Return an array of task objects"""},
-                {"role": "user", "content": text}
-            ],
+@traced('parse.task')
+def _parse_task(text, timeout=None, known_assignees=()):
+    """Parse a single task, raising on failure instead of reporting to the UI."""
+    # Simple lines are handled locally; only uncertain ones go to OpenAI
+    with span('parse.fast_path'):
+        fast_task = try_fast_parse(text, known_assignees)
+    if fast_task:
+        return fast_task
+
+    return _parse_with_llm(text, timeout)
+
+def _parse_with_llm(text, timeout=None):
+    """Parse one task line with its own completion."""
+    raw = _complete(TASK_PROMPT, text, timeout)
+    with span('json.loads'):
+        parsed_data = json.loads(raw)
+    return _clean_task(parsed_data)
+
+def iter_parse_tasks(lines, max_workers=BATCH_MAX_WORKERS, timeout=BATCH_REQUEST_TIMEOUT, known_assignees=()):
+    """Parse task lines concurrently, yielding (index, text, task, error) as each line finishes.
+
+    Each OpenAI request is bounded by `timeout` seconds. A line that fails or
+    cannot be parsed yields task=None and an error message instead of
+    stopping the batch. With PACKED_PARSING, lines the fast path cannot
+    handle share completions (see iter_parse_packed).
+    """
+    if not lines:
+        return
+    if PACKED_PARSING and len(lines) > 1:
+        yield from iter_parse_packed(lines, max_workers, timeout, known_assignees)
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(lines))) as executor:
+        futures = {
+            # Each worker runs in a copy of the caller's context so its spans join the current rerun
+            executor.submit(contextvars.copy_context().run, _parse_task, text, timeout, known_assignees): (index, text)
+            for index, text in enumerate(lines)
+        }
+        for future in as_completed(futures):
+            index, text = futures[future]
+            try:
+                task = future.result()
+                error = None if task else "Could not parse task"
+            except Exception as e:
+                task = None
+                error = str(e)
+            yield index, text, task, error
+
+def parse_tasks(lines, max_workers=BATCH_MAX_WORKERS, timeout=BATCH_REQUEST_TIMEOUT, known_assignees=()):
+    """Parse task lines concurrently and return (task, error) pairs in input order."""
+    results = [(None, None)] * len(lines)
+    for index, _, task, error in iter_parse_tasks(lines, max_workers, timeout, known_assignees):
+        results[index] = (task, error)
+    return results
+
+def pack_lines(items, budget=PACK_TOKEN_BUDGET):
+    """Group (index, text) items into batches for packed completions.
+
+    Each batch's prompt tokens plus its expected output tokens stay within
+    budget, counted locally; a single line over budget gets a batch of its own.
+    """
+    fixed = count_message_tokens([
+        {'role': 'system', 'content': PACKED_TASK_PROMPT},
+        {'role': 'user', 'content': ''}
+    ], MODEL)
+    output_per_line = _expected_output_tokens()
+    batches, batch, used = [], [], fixed
+    for item in items:
+        cost = count_tokens(f"{len(batch)}: {item[1]}\n", MODEL) + output_per_line
+        if batch and used + cost > budget:
+            batches.append(batch)
+            batch, used = [], fixed
+        batch.append(item)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _expected_output_tokens():
+    """Output tokens to reserve per packed line, learned from earlier responses."""
+    with _packing_lock:
+        tasks, completion_tokens = _packing_stats['tasks'], _packing_stats['completion_tokens']
+    if tasks < 20:
+        return PACK_OUTPUT_TOKENS_PER_LINE
+    return int(completion_tokens / tasks * 1.25) + 1
+
+def _complete_packed(texts, timeout=None):
+    """Parse several task lines with one completion.
+
+    Returns {position: entry} for the lines that came back as well-formed
+    entries; each entry is also stored in the parse cache on its own.
+    """
+    messages = [
+        {"role": "system", "content": PACKED_TASK_PROMPT},
+        {"role": "user", "content": '\n'.join(f"{position}: {text}" for position, text in enumerate(texts))}
+    ]
+    started = time.perf_counter()
+    with span('llm.openai_packed'):
+        response = scheduler.create_completion(
+            output_tokens=_expected_output_tokens() * len(texts),
+            timeout=timeout,
+            model=MODEL,
+            messages=messages,
             temperature=0,
             response_format={"type": "json_object"}
         )
-        
-        parsed_data = json.loads(response.choices[0].message.content)
-        tasks = parsed_data.get('tasks', [])
-        
-        # Process each task
-        processed_tasks = []
-        for task in tasks:
-            # Convert the date string to datetime object
-            if task.get('due_date'):
+    elapsed = time.perf_counter() - started
+    raw = response.choices[0].message.content or ''
+    with span('json.loads'):
+        try:
+            entries = json.loads(raw).get('tasks', [])
+        except (ValueError, AttributeError):
+            entries = []
+
+    results = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        position = entry.get('index')
+        if (isinstance(position, int) and 0 <= position < len(texts) and position not in results
+                and all(isinstance(entry.get(field), str) for field in _TASK_FIELDS[:3])):
+            results[position] = {field: entry[field] for field in _TASK_FIELDS if isinstance(entry.get(field), str)}
+
+    version = prompt_version(PACKED_TASK_PROMPT)
+    with span('parse_cache.put'):
+        for position, entry in results.items():
+            get_parse_cache().put(texts[position], MODEL, version, json.dumps(entry))
+
+    usage = response.usage
+    unpacked = sum(
+        count_message_tokens([{"role": "system", "content": TASK_PROMPT}, {"role": "user", "content": text}], MODEL)
+        for text in texts
+    )
+    with _packing_lock:
+        _packing_stats['requests'] += 1
+        _packing_stats['tasks'] += len(texts)
+        _packing_stats['prompt_tokens'] += usage.prompt_tokens if usage and usage.prompt_tokens else \
+            count_message_tokens(messages, MODEL)
+        _packing_stats['completion_tokens'] += usage.completion_tokens if usage and usage.completion_tokens else \
+            count_tokens(raw, MODEL)
+        _packing_stats['unpacked_prompt_tokens'] += unpacked
+        _packing_stats['seconds'] += elapsed
+    return results
+
+def _clean_entry(entry):
+    """Turn a raw task entry into (task, error); a malformed entry becomes that line's error."""
+    try:
+        task = _clean_task(entry)
+    except Exception as e:
+        return None, str(e)
+    return task, None if task else "Could not parse task"
+
+def iter_parse_packed(lines, max_workers=BATCH_MAX_WORKERS, timeout=BATCH_REQUEST_TIMEOUT, known_assignees=()):
+    """Parse task lines with packed completions, yielding (index, text, task, error).
+
+    Lines the fast path or the parse cache can answer never reach OpenAI.
+    The rest are grouped by pack_lines and the batches sent concurrently.
+    Lines missing or malformed in a packed response, or in a batch whose
+    request failed, are retried individually with the single-task prompt.
+    """
+    versions = (prompt_version(PACKED_TASK_PROMPT), prompt_version(TASK_PROMPT))
+    pending = []
+    for index, text in enumerate(lines):
+        with span('parse.fast_path'):
+            task = try_fast_parse(text, known_assignees)
+        if task:
+            yield index, text, task, None
+            continue
+        # Lines retried on their own earlier were cached under the single-task prompt
+        with span('parse_cache.get'):
+            cache = get_parse_cache()
+            raw = cache.get(text, MODEL, versions[0]) or cache.get(text, MODEL, versions[1])
+        if raw is None:
+            pending.append((index, text))
+        else:
+            yield (index, text, *_clean_entry(json.loads(raw)))
+    if not pending:
+        return
+
+    batches = pack_lines(pending) if len(pending) > 1 else []
+    singles = [] if batches else pending
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches) + len(singles))) as executor:
+        def submit_single(index, text):
+            future = executor.submit(contextvars.copy_context().run, _parse_with_llm, text, timeout)
+            futures[future] = (index, text)
+
+        futures = {}
+        for batch in batches:
+            future = executor.submit(contextvars.copy_context().run, _complete_packed, [text for _, text in batch], timeout)
+            futures[future] = batch
+        for index, text in singles:
+            submit_single(index, text)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = futures.pop(future)
+                if isinstance(job, tuple):
+                    index, text = job
+                    try:
+                        task = future.result()
+                        error = None if task else "Could not parse task"
+                    except Exception as e:
+                        task = None
+                        error = str(e)
+                    yield index, text, task, error
+                    continue
                 try:
-                    date_text = task['due_date'].lower()
-                    current_time = datetime.now()
-                    
-                    if 'tomorrow' in date_text:
-                        base_date = current_time + timedelta(days=1)
-                    elif 'next week' in date_text:
-                        base_date = current_time + timedelta(weeks=1)
-                    elif 'today' in date_text:
-                        base_date = current_time
-                    elif 'tonight' in date_text:
-                        base_date = current_time
-                        # Set default time to 8 PM for "tonight"
-                        hour = 20
-                        minute = 0
-                    elif 'end of day' in date_text or 'eod' in date_text:
-                        base_date = current_time
-                        # Set default time to 5 PM for "end of day"
-                        hour = 17
-                        minute = 0
+                    entries = future.result()
+                except Exception:
+                    entries = {}
+                for position, (index, text) in enumerate(job):
+                    if position in entries:
+                        yield (index, text, *_clean_entry(entries[position]))
                     else:
-                        base_date = parser.parse(date_text, fuzzy=True)
-                    
-                    # Extract time if specified
-                    time_pattern = r'(\d{1,2})(?::(\d{1,2}))?\s*(am|pm|AM|PM)?'
-                    time_match = re.search(time_pattern, date_text)
-                    
-                    if time_match:
-                        hour = int(time_match.group(1))
-                        minute = int(time_match.group(2)) if time_match.group(2) else 0
-                        period = time_match.group(3)
-                        
-                        if period and period.lower() == 'pm' and hour != 12:
-                            hour += 12
-                        elif period and period.lower() == 'am' and hour == 12:
-                            hour = 0
-                        
-                        task['due_date'] = base_date.replace(
-                            hour=hour,
-                            minute=minute,
-                            second=0,
-                            microsecond=0
-                        )
-                    elif 'tonight' in date_text or 'end of day' in date_text or 'eod' in date_text:
-                        # Use the default times we set earlier
-                        task['due_date'] = base_date.replace(
-                            hour=hour,
-                            minute=minute,
-                            second=0,
-                            microsecond=0
-                        )
-                    else:
-                        # Default to 9 AM if no time specified
-                        task['due_date'] = base_date.replace(
-                            hour=9,
-                            minute=0,
-                            second=0,
-                            microsecond=0
-                        )
-                except Exception as e:
-                    st.error(f"Could not parse date: {task['due_date']} - {str(e)}")
-                    continue
-            
-            # Ensure priority is valid
-            if 'priority' in task:
-                priority = task['priority'].upper()
-                if priority not in ['P1', 'P2', 'P3', 'P4']:
-                    priority = 'P3'
-                task['priority'] = priority
-            else:
-                task['priority'] = 'P3'
-                
-            # Clean up and validate
-            task_name = task.get('task_name', '').strip()
-            assignee = task.get('assignee', '').strip()
-            
-            if task_name and assignee and task.get('due_date'):
-                processed_tasks.append({
-                    'task_name': task_name,
-                    'assignee': assignee,
-                    'due_date': task['due_date'],
-                    'priority': task['priority']
-                })
+                        with _packing_lock:
+                            _packing_stats['retries'] += 1
+                        submit_single(index, text)
+
+def get_packing_stats():
+    """Prompt token, latency and retry totals of packed parsing.
+
+    unpacked_prompt_tokens_per_task is what the same lines would have cost
+    with one completion each, counted locally.
+    """
+    with _packing_lock:
+        stats = dict(_packing_stats)
+    tasks = stats['tasks']
+    stats['prompt_tokens_per_task'] = stats['prompt_tokens'] / tasks if tasks else 0.0
+    stats['unpacked_prompt_tokens_per_task'] = stats['unpacked_prompt_tokens'] / tasks if tasks else 0.0
+    stats['seconds_per_task'] = stats['seconds'] / tasks if tasks else 0.0
+    return stats
+
+def split_transcript(text, max_chars=TRANSCRIPT_CHUNK_CHARS, overlap=TRANSCRIPT_CHUNK_OVERLAP):
+    """Split a transcript into chunks of whole speaker lines or sentences.
+
+    Each chunk holds at most max_chars characters (a single longer sentence
+    becomes its own chunk) and repeats the last `overlap` sentences of the
+    previous chunk, so a task spanning a boundary is seen whole at least once.
+    """
+    units = [
+        sentence
+        for line in text.splitlines()
+        for sentence in _SENTENCE_END_RE.split(line.strip())
+        if sentence
+    ]
+    chunks = []
+    current = []
+    fresh = 0
+    for unit in units:
+        if fresh and sum(len(u) + 1 for u in current) + len(unit) > max_chars:
+            chunks.append(' '.join(current))
+            current = current[-overlap:] if overlap else []
+            fresh = 0
+        current.append(unit)
+        fresh += 1
+    if fresh:
+        chunks.append(' '.join(current))
+    return chunks
+
+def _task_key(task):
+    """Key under which tasks extracted from overlapping chunks are merged."""
+    name = ' '.join(_WORD_RE.findall(task['task_name'].lower()))
+    return (name, task['assignee'].lower(), task['due_date'])
+
+def _clean_task(task):
+    """Validate one task from the LLM JSON; raises ValueError on a bad date."""
+    if not isinstance(task, dict):
+        return None
+    # Fields that are not strings (null, numbers, lists) count as missing
+    task = {field: value for field, value in task.items() if isinstance(value, str)}
+    # Convert the date string to datetime object
+    if task.get('due_date'):
+        try:
+            task['due_date'] = resolve_due_date(task['due_date'])
+        except Exception as e:
+            raise ValueError(f"Could not parse date: {task['due_date']} - {str(e)}")
+    
+    # Ensure priority is valid
+    if 'priority' in task:
+        priority = task['priority'].upper()
+        if priority not in ['P1', 'P2', 'P3', 'P4']:
+            priority = 'P3'
+        task['priority'] = priority
+    else:
+        task['priority'] = 'P3'
         
-        return processed_tasks
-    except Exception as e:
-        st.error(f"Error parsing transcript: {str(e)}")
-        return []
\ No newline at end of file
+    # Clean up and validate
+    task_name = task.get('task_name', '').strip()
+    assignee = task.get('assignee', '').strip()
+    
+    if not task_name or not assignee or not task.get('due_date'):
+        return None
+    return {
+        'task_name': task_name,
+        'assignee': assignee,
+        'due_date': task['due_date'],
+        'priority': task['priority']
+    }
+
+def iter_parse_transcript(text, complete=None, max_workers=BATCH_MAX_WORKERS, timeout=BATCH_REQUEST_TIMEOUT,
+                          max_chars=TRANSCRIPT_CHUNK_CHARS, overlap=TRANSCRIPT_CHUNK_OVERLAP):
+    """Parse a transcript chunk by chunk, yielding (task, error) pairs as chunks finish.
+
+    Chunks from split_transcript are sent concurrently through
+    complete(prompt, text, timeout), which defaults to the cached OpenAI call
+    and can be replaced by any function returning the raw JSON. Tasks found
+    twice in overlapping chunks are yielded once. Exactly one of task and
+    error is set in each pair.
+    """
+    complete = complete or _complete
+    chunks = split_transcript(text, max_chars, overlap)
+    if len(chunks) == 1:
+        # Keep the whole text so short transcripts share cache entries with earlier runs
+        chunks = [text]
+    if not chunks:
+        return
+    seen = set()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, complete, TRANSCRIPT_PROMPT, chunk, timeout)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            try:
+                raw = future.result()
+                with span('json.loads'):
+                    tasks = json.loads(raw).get('tasks', [])
+            except Exception as e:
+                yield None, f"Error parsing transcript: {str(e)}"
+                continue
+            for task in tasks:
+                try:
+                    task = _clean_task(task)
+                except ValueError as e:
+                    yield None, str(e)
+                    continue
+                if task and _task_key(task) not in seen:
+                    seen.add(_task_key(task))
+                    yield task, None
+
+def parse_transcript(text):
+    """Parse a transcript containing multiple tasks into a list of structured tasks."""
+    processed_tasks = []
+    for task, error in iter_parse_transcript(text):
+        if error:
+            st.error(error)
+        else:
+            processed_tasks.append(task)
+    return processed_tasks
@@ -0,0 +1,54 @@
+"""Local token counts for budgeting LLM requests before they are sent.
+
+Uses tiktoken's encoding for the model when tiktoken is installed. Without
+it, tokens are estimated from word, number and punctuation pieces the way
+BPE vocabularies typically split English text: short words are one token,
+longer words one per four characters, numbers one per three digits.
+"""
+import functools
+import re
+
+# Per-message framing tokens of the chat format, plus the assistant reply primer
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+
+_PIECE_RE = re.compile(r'[A-Za-z]+|\d+|[^\sA-Za-z\d]')
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def _estimate(text):
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece.isdigit():
+            tokens += (len(piece) + 2) // 3
+        elif piece.isalpha():
+            tokens += 1 if len(piece) <= 6 else (len(piece) + 3) // 4
+        else:
+            tokens += 1
+    return tokens
+
+
+def count_tokens(text, model='gpt-3.5-turbo'):
+    """Number of tokens text encodes to for model."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return _estimate(text)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages, model='gpt-3.5-turbo'):
+    """Prompt tokens a chat completion request with these messages is billed for."""
+    return REPLY_OVERHEAD_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + count_tokens(message['content'], model) for message in messages
+    )
@@ -0,0 +1,141 @@
+"""Lightweight timing spans for the parse, LLM, database and render stages.
+
+Wrap a stage in `with span('llm'):` or decorate it with `@traced('db.add_tasks')`.
+Spans are aggregated per Streamlit rerun: app.py calls start_rerun() at the
+top of the script and finish_rerun() at the end, which appends the rerun's
+breakdown to TRACE_LOG_PATH as one JSON line and rewrites TRACE_PROM_PATH
+with process-wide totals in Prometheus text format (for a node_exporter
+textfile collector). Worker threads join the rerun that submitted them when
+run through contextvars.copy_context().run.
+
+Tracing is off unless TRACING_ENABLED is set. Disabled, span() returns a
+shared no-op context manager and traced functions cost one flag check.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', '').lower() in ('1', 'true', 'yes')
+TRACE_LOG_PATH = os.environ.get('TRACE_LOG_PATH', '.traces.jsonl')
+TRACE_PROM_PATH = os.environ.get('TRACE_PROM_PATH')
+
+_NOOP = contextlib.nullcontext()
+_current_rerun = contextvars.ContextVar('current_rerun', default=None)
+_totals_lock = threading.Lock()
+_totals = {}
+
+
+def set_enabled(enabled):
+    global TRACING_ENABLED
+    TRACING_ENABLED = enabled
+
+
+class Rerun:
+    """Per-stage call counts and durations for one rerun."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            stage = self.stages.setdefault(name, [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += seconds
+            stage[2] = max(stage[2], seconds)
+
+    def summary(self):
+        """Return {stage: {'count', 'total_ms', 'max_ms'}} sorted by total time."""
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {'count': count, 'total_ms': round(total * 1000, 3), 'max_ms': round(longest * 1000, 3)}
+            for name, (count, total, longest) in stages
+        }
+
+
+class _Span:
+    __slots__ = ('name', 'rerun', 'started')
+
+    def __init__(self, name, rerun):
+        self.name = name
+        self.rerun = rerun
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        if self.rerun is not None:
+            self.rerun.record(self.name, elapsed)
+        with _totals_lock:
+            total = _totals.setdefault(self.name, [0, 0.0])
+            total[0] += 1
+            total[1] += elapsed
+        return False
+
+
+def span(name):
+    """Context manager timing one stage; a no-op when tracing is disabled."""
+    if not TRACING_ENABLED:
+        return _NOOP
+    return _Span(name, _current_rerun.get())
+
+
+def traced(name):
+    """Decorator timing every call of a function as the given stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            with _Span(name, _current_rerun.get()):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_rerun():
+    """Start collecting spans for the current rerun and return its Rerun."""
+    if not TRACING_ENABLED:
+        return None
+    rerun = Rerun()
+    _current_rerun.set(rerun)
+    return rerun
+
+
+def finish_rerun(rerun):
+    """Export a finished rerun to the JSON lines log and the Prometheus file."""
+    if rerun is None:
+        return
+    if TRACE_LOG_PATH:
+        with open(TRACE_LOG_PATH, 'a') as f:
+            f.write(json.dumps({'started': rerun.started, 'stages': rerun.summary()}) + '\n')
+    if TRACE_PROM_PATH:
+        tmp_path = f"{TRACE_PROM_PATH}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, TRACE_PROM_PATH)
+
+
+def prometheus_text():
+    """Process-wide stage totals in the Prometheus text exposition format."""
+    with _totals_lock:
+        totals = sorted(_totals.items())
+    lines = [
+        '# HELP task_manager_stage_seconds_total Time spent in each traced stage.',
+        '# TYPE task_manager_stage_seconds_total counter'
+    ]
+    lines += [f'task_manager_stage_seconds_total{{stage="{name}"}} {seconds:.6f}' for name, (_, seconds) in totals]
+    lines += [
+        '# HELP task_manager_stage_calls_total Number of traced calls of each stage.',
+        '# TYPE task_manager_stage_calls_total counter'
+    ]
+    lines += [f'task_manager_stage_calls_total{{stage="{name}"}} {count}' for name, (count, _) in totals]
+    return '\n'.join(lines) + '\n'